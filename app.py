@@ -1,22 +1,19 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-import io
+import os
+import time
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.express as px
-
-# --- 백엔드 함수 (변경 없음) ---
-def calculate_ror(df):
-    if 'temp above' not in df.columns or 'time' not in df.columns: df['ror_calc'] = np.nan; return df
-    if df['temp above'].isnull().all(): df['ror_calc'] = np.nan; return df
-    last_valid_index = df['temp above'].last_valid_index()
-    if last_valid_index is None: df['ror_calc'] = np.nan; return df
-    calc_df = df.loc[0:last_valid_index].copy()
-    delta_temp = calc_df['temp above'].diff(); delta_time = calc_df['time'].diff()
-    ror = (delta_temp / delta_time).replace([np.inf, -np.inf], 0).fillna(0)
-    calc_df['ror_calc'] = ror; df.update(calc_df)
-    return df
+from log_loader import (
+    LogCache, content_hash, ingest_logs, make_parse_pool, EXHAUST_TEMP_COL, INLET_TEMP_COL, EXHAUST_ROR_COL,
+    FAN_SPEED_COL, HUMIDITY_COL, HUMIDITY_ROC_COL,
+)
+from roast_store import CHANNELS, LookupTable, RoastLog, session_memory_usage
+from downsample import DOWNSAMPLE_METHODS, downsample
+from ror import DEFAULT_ROR_METHOD, DEFAULT_ROR_WINDOW, ROR_METHODS, ror_for_series
+from profile_index import INDEX_METRICS, ProfileIndex
+from live_tail import LiveTail, open_source
 
 # --- UI 및 앱 실행 로직 ---
 st.set_page_config(layout="wide")
@@ -25,6 +22,7 @@ st.markdown("**(v.1.0 2025.10.24)**") # 버전 업데이트
 
 # --- Session State 초기화 (변경 없음) ---
 if 'processed_logs' not in st.session_state: st.session_state.processed_logs = {}
+if 'log_hashes' not in st.session_state: st.session_state.log_hashes = {}
 if 'selected_time' not in st.session_state: st.session_state.selected_time = 0
 if 'axis_ranges' not in st.session_state:
     st.session_state.axis_ranges = {
@@ -33,18 +31,179 @@ if 'axis_ranges' not in st.session_state:
         'y_hum1': [8, 22], 'y_hum2': [-0.04, 0.06]
     }
 
-# --- 예상되는 전체 헤더 목록 ---
-expected_headers = [
-    'time', 'fan set', 'setpoint', 'fan speed', 'temp above', 'state',
-    'heater', 'p', 'i', 'd', 'temp below', 'temp board', 'j', 'ror_above',
-    'abs_humidity', 'abs_humidity_roc', 'abs_humidity_roc_direction',
-    'adfc_timestamp', 'end_timestamp', 'tdf_error', 'pressure',
-    'total_moisture_loss', 'moisture_loss_rate'
-]
-# --- 핵심 데이터 열 이름 ---
-TIME_COL = 'time'; EXHAUST_TEMP_COL = 'temp above'; INLET_TEMP_COL = 'temp below'
-EXHAUST_ROR_COL = 'ror_above'; STATE_COL = 'state'; FAN_SPEED_COL = 'fan speed'
-HUMIDITY_COL = 'abs_humidity'; HUMIDITY_ROC_COL = 'abs_humidity_roc'
+# --- 파싱 결과 디스크 캐시 (세션 간 공유) ---
+@st.cache_resource
+def get_log_cache():
+    return LogCache()
+
+# --- 파싱 워커 풀 (세션 간 공유, 워커 수 제한) ---
+@st.cache_resource(on_release=lambda pool: pool.shutdown(wait=False, cancel_futures=True))
+def get_parse_pool():
+    return make_parse_pool()
+
+# --- 유사 로스팅 검색 인덱스 (세션 간 공유) ---
+@st.cache_resource
+def get_profile_index():
+    return ProfileIndex()
+
+# --- 트레이스 다운샘플링 (로그/채널/포인트 예산별 캐시) ---
+@st.cache_data(max_entries=4096, show_spinner=False)
+def downsampled_series(log_key, channel, budget, method, skip_first, _log):
+    t, y = _log.valid_series(channel)
+    if skip_first: t, y = t[1:], y[1:]
+    return downsample(t, y, budget, method)
+
+def plot_series(log_key, log, channel, plot_points, skip_first=False):
+    t, y = log.valid_series(channel)
+    if len(t) <= 1: return t, y
+    n_full = len(t) - 1 if skip_first else len(t)
+    budget = st.session_state.point_budget
+    if budget <= 0 or n_full <= budget:
+        # 줄일 필요가 없으면 원본 뷰를 그대로 씁니다 (세션 공유 캐시에 전체 해상도 복사본을 남기지 않음).
+        plot_points[0] += n_full; plot_points[1] += n_full
+        return (t[1:], y[1:]) if skip_first else (t, y)
+    t, y = downsampled_series(log_key, channel, budget, st.session_state.downsample_method, skip_first, log)
+    plot_points[0] += n_full; plot_points[1] += len(t)
+    return t, y
+
+# --- 그래프 구성: 트레이스 레이어 (로그/팬 스케일이 바뀔 때만 다시 생성) ---
+FAN_SCALE_THRESHOLD = 2000
+def build_trace_layer(selected_profiles_data, logs, log_keys, color_map, has_high_scale_fan, has_low_scale_fan):
+    # 사용자 지정 비율 적용
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, row_heights=[0.7, 0.2, 0.1], vertical_spacing=0.03, specs=[[{"secondary_y": True}], [{"secondary_y": True}], [{"secondary_y": True}]])
+    plot_points = [0, 0]  # [원본 포인트 수, 표시 포인트 수]
+    for name in selected_profiles_data:
+        log = logs.get(name); color = color_map.get(name)
+        if log is not None and color is not None:
+            t, y = plot_series(log_keys.get(name, name), log, EXHAUST_TEMP_COL, plot_points)
+            if len(t) > 1: fig.add_trace(go.Scatter(x=t, y=y, mode='lines', name=f'{name} Exhaust Temp', line=dict(color=color, dash='solid')), row=1, col=1, secondary_y=False)
+            t, y = plot_series(log_keys.get(name, name), log, INLET_TEMP_COL, plot_points)
+            if len(t) > 1: fig.add_trace(go.Scatter(x=t, y=y, mode='lines', name=f'{name} Inlet Temp', line=dict(color=color, dash='solid')), row=1, col=1, secondary_y=False)
+            t, y = log.valid_series(EXHAUST_ROR_COL)
+            if len(t) > 1:
+                t, y = plot_series(log_keys.get(name, name), log, EXHAUST_ROR_COL, plot_points, skip_first=True)
+                fig.add_trace(go.Scatter(x=t, y=y, mode='lines', name=f'{name} ROR', line=dict(color=color, dash='dot'), showlegend=False), row=1, col=1, secondary_y=True)
+            t, y = plot_series(log_keys.get(name, name), log, HUMIDITY_COL, plot_points)
+            if len(t) > 1: fig.add_trace(go.Scatter(x=t, y=y, mode='lines', name=f'{name} Humidity', line=dict(color=color, dash='solid'), showlegend=True), row=2, col=1, secondary_y=False)
+            t, y = plot_series(log_keys.get(name, name), log, HUMIDITY_ROC_COL, plot_points)
+            if len(t) > 1: fig.add_trace(go.Scatter(x=t, y=y, mode='lines', name=f'{name} Humidity RoC', line=dict(color=color, dash='solid'), showlegend=True), row=2, col=1, secondary_y=True)
+            t, y = plot_series(log_keys.get(name, name), log, FAN_SPEED_COL, plot_points)
+            if len(t) > 1:
+                is_high_scale = y.max() > FAN_SCALE_THRESHOLD
+                if not has_high_scale_fan and has_low_scale_fan:
+                    fig.add_trace(go.Scatter(x=t, y=y, mode='lines', name=f'{name} Fan Speed (Low)', line=dict(color=color, dash='solid'), showlegend=True), row=3, col=1, secondary_y=False)
+                elif is_high_scale:
+                    fig.add_trace(go.Scatter(x=t, y=y, mode='lines', name=f'{name} Fan Speed (High)', line=dict(color=color, dash='solid'), showlegend=True), row=3, col=1, secondary_y=False)
+                else:
+                    fig.add_trace(go.Scatter(x=t, y=y, mode='lines', name=f'{name} Fan Speed (Low)', line=dict(color=color, dash='solid'), showlegend=True), row=3, col=1, secondary_y=True)
+    return fig, plot_points
+
+# --- 계산 ROR: 로드된 로그 전체를 한 번에 계산해서 ROR 채널만 바꾼 로그를 만듭니다 ---
+def computed_ror_logs(logs, log_hashes, method, window_seconds):
+    names = [name for name, log in logs.items() if log.valid_count(EXHAUST_TEMP_COL) > 1]
+    rors = ror_for_series([log.valid_series(EXHAUST_TEMP_COL) for log in (logs[name] for name in names)], method, window_seconds)
+    display_logs = dict(logs); display_keys = dict(log_hashes)
+    for name, ror in zip(names, rors):
+        log = logs[name]
+        values = np.full(len(log), np.nan, dtype=np.float32)
+        values[log.valid[log.channel_index[EXHAUST_TEMP_COL]]] = ror
+        display_logs[name] = log.with_channel(EXHAUST_ROR_COL, values)
+        display_keys[name] = f"{log_hashes.get(name, name)}:ror={method}/{window_seconds}"
+    return display_logs, display_keys
+
+# --- 그래프 구성: 레이아웃 레이어 (축 범위와 선택 시간 표시선, 매 rerun 적용) ---
+def apply_layout(fig, axis_ranges, selected_time_int, has_high_scale_fan, has_low_scale_fan):
+    # add_vline은 모든 트레이스를 훑으므로 세 행의 표시선을 직접 지정합니다.
+    vline = dict(type='line', x0=selected_time_int, x1=selected_time_int, y0=0, y1=1, line=dict(width=1, dash='dash', color='grey'))
+    fig.update_layout(shapes=[dict(vline, xref=xref, yref=yref) for xref, yref in [('x', 'y domain'), ('x2', 'y3 domain'), ('x3', 'y5 domain')]])
+    fig.update_layout(height=1000, legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    fig.update_xaxes(range=axis_ranges['x'], showticklabels=False, dtick=60, row=1, col=1)
+    fig.update_xaxes(range=axis_ranges['x'], showticklabels=False, dtick=60, row=2, col=1)
+    fig.update_xaxes(range=axis_ranges['x'], title_text='시간 (초)', dtick=60, row=3, col=1)
+    fig.update_yaxes(title_text="온도 (°C)", range=axis_ranges['y_temp'], dtick=10, row=1, col=1, secondary_y=False)
+    fig.update_yaxes(title_text="ROR (℃/sec)", range=axis_ranges['y_ror'], showgrid=False, row=1, col=1, secondary_y=True)
+    fig.update_yaxes(title_text="Abs Humidity", range=axis_ranges['y_hum1'], row=2, col=1, secondary_y=False)
+    fig.update_yaxes(title_text="Humidity RoC", range=axis_ranges['y_hum2'], showgrid=False, row=2, col=1, secondary_y=True)
+    if not has_high_scale_fan and has_low_scale_fan:
+        fig.update_yaxes(title_text="Fan Speed (Low)", range=axis_ranges['y_fan2'], row=3, col=1, secondary_y=False)
+        fig.update_yaxes(visible=False, row=3, col=1, secondary_y=True)
+    elif has_high_scale_fan and not has_low_scale_fan:
+        fig.update_yaxes(title_text="Fan Speed (High)", range=axis_ranges['y_fan1'], row=3, col=1, secondary_y=False)
+        fig.update_yaxes(visible=False, row=3, col=1, secondary_y=True)
+    elif has_high_scale_fan and has_low_scale_fan:
+        fig.update_yaxes(title_text="Fan Speed (High)", range=axis_ranges['y_fan1'], row=3, col=1, secondary_y=False)
+        fig.update_yaxes(title_text="Fan Speed (Low)", range=axis_ranges['y_fan2'], showgrid=False, row=3, col=1, secondary_y=True)
+    else:
+        fig.update_yaxes(title_text="Fan Speed (High)", range=axis_ranges['y_fan1'], row=3, col=1, secondary_y=False)
+        fig.update_yaxes(title_text="Fan Speed (Low)", range=axis_ranges['y_fan2'], showgrid=False, row=3, col=1, secondary_y=True)
+    return fig
+
+# --- 라이브 모드: 그림은 한 번만 만들고 tick마다 트레이스 배열만 바꿉니다 ---
+LIVE_PHASE_LABELS = {'waiting': '로스팅 시작 대기', 'roasting': '로스팅 중', 'finished': '쿨링 시작 (종료)'}
+def build_live_figure():
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.75, 0.25], vertical_spacing=0.05, specs=[[{"secondary_y": True}], [{"secondary_y": False}]])
+    fig.add_trace(go.Scatter(mode='lines', name='Exhaust Temp'), row=1, col=1, secondary_y=False)
+    fig.add_trace(go.Scatter(mode='lines', name='Inlet Temp'), row=1, col=1, secondary_y=False)
+    fig.add_trace(go.Scatter(mode='lines', name='ROR (계산)', line=dict(dash='dot')), row=1, col=1, secondary_y=True)
+    fig.add_trace(go.Scatter(mode='lines', name='Fan Speed'), row=2, col=1)
+    fig.update_layout(height=600, uirevision='live', legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    fig.update_yaxes(title_text="온도 (°C)", row=1, col=1, secondary_y=False)
+    fig.update_yaxes(title_text="ROR (℃/sec)", showgrid=False, row=1, col=1, secondary_y=True)
+    fig.update_yaxes(title_text="Fan Speed", row=2, col=1)
+    fig.update_xaxes(title_text='시간 (초)', dtick=60, row=2, col=1)
+    return fig
+
+def update_live_figure(fig, tail, axis_ranges):
+    # ROR은 이후 데이터로 바뀌지 않는 확정 구간까지만 그립니다.
+    ror_grid, ror = tail.ror_series()
+    x_max = max(axis_ranges['x'][1], float(tail.times[-1]) if tail.n else 0.0)
+    with fig.batch_update():
+        fig.data[0].update(x=tail.times, y=tail.column(EXHAUST_TEMP_COL))
+        fig.data[1].update(x=tail.times, y=tail.column(INLET_TEMP_COL))
+        fig.data[2].update(x=ror_grid[:tail.ror_final], y=ror[:tail.ror_final])
+        fig.data[3].update(x=tail.times, y=tail.column(FAN_SPEED_COL))
+        fig.update_xaxes(range=[axis_ranges['x'][0], x_max])
+        fig.update_yaxes(range=axis_ranges['y_temp'], row=1, col=1, secondary_y=False)
+        fig.update_yaxes(range=axis_ranges['y_ror'], row=1, col=1, secondary_y=True)
+    return fig
+
+def stop_live():
+    # 지금까지 받은 로스팅 구간을 비교 차트용 로그로 남기고 라이브 상태를 정리합니다.
+    tail = st.session_state.pop('live_tail', None); source = st.session_state.pop('live_source_active', '')
+    st.session_state.live_figure = None
+    if tail is None: return
+    tail.close()
+    if tail.n > 1:
+        base_name = f"[라이브] {os.path.basename(source.rstrip('/')) or source}"
+        # 같은 소스로 여러 번 기록해도 이전 기록을 덮어쓰지 않도록 번호를 붙입니다.
+        name = base_name; number = 2
+        while name in st.session_state.processed_logs: name = f"{base_name} ({number})"; number += 1
+        log = tail.to_roast_log()
+        # downsampled_series 캐시는 세션 간 공유되므로 경로가 아니라 받은 데이터로 키를 만듭니다.
+        st.session_state.processed_logs[name] = log
+        st.session_state.log_hashes[name] = f"live:{content_hash(log.time.tobytes() + log.values.tobytes())}"
+        selected = st.session_state.get('selected_profiles', [])
+        if name not in selected: st.session_state.selected_profiles = selected + [name]
+
+def live_panel():
+    tail = st.session_state.get('live_tail')
+    if tail is None: return
+    tick_start = time.perf_counter()
+    try: tail.poll()
+    except ValueError as e:
+        st.error(f"라이브 소스를 읽을 수 없습니다: {e}"); return
+    poll_done = time.perf_counter()
+    if st.session_state.get('live_figure') is None: st.session_state.live_figure = build_live_figure()
+    st.plotly_chart(update_live_figure(st.session_state.live_figure, tail, st.session_state.axis_ranges), use_container_width=True, key="live_chart")
+    chart_done = time.perf_counter()
+    status = f"{LIVE_PHASE_LABELS[tail.phase]} · 로스팅 행 {tail.n:,}"
+    if tail.n:
+        elapsed = float(tail.times[-1]); status += f" · {int(elapsed // 60)}분 {int(elapsed % 60):02d}초 · Exhaust {tail.column(EXHAUST_TEMP_COL)[-1]:.1f}℃"
+    if tail.ror_final: status += f" · ROR {tail.ror[tail.ror_final - 1]:.3f}℃/sec"
+    st.caption(status)
+    st.caption(f"⏱️ 새 행 파싱/ROR {(poll_done - tick_start) * 1000:.1f} ms · 차트 갱신 {(chart_done - poll_done) * 1000:.1f} ms")
+    if tail.phase == 'finished':
+        stop_live(); st.rerun()
 
 # --- 사이드바 UI (변경 없음) ---
 with st.sidebar:
@@ -55,9 +214,63 @@ with st.sidebar:
         default_selected = [p for p in default_selected if p in profile_names_sidebar]
         if not default_selected: default_selected = profile_names_sidebar
         st.session_state.selected_profiles = st.multiselect("그래프에 표시할 로그 선택", options=profile_names_sidebar, default=default_selected)
+        # 로그 배열 + 계산 ROR 사본 + 조회 테이블 + 캐시된 트레이스 그림 (직전 실행 기준)
+        session_bytes = session_memory_usage(
+            st.session_state.processed_logs, st.session_state.get('computed_ror', (None, {}, {}))[1].values(),
+            st.session_state.get('lookup_table'), st.session_state.get('trace_layer', (None, None))[1])
+        st.caption(f"로그 {len(profile_names_sidebar)}개, 세션 메모리 {session_bytes / 1024 / 1024:.2f} MB")
     else:
         st.info("CSV 파일을 업로드하면 로그 목록이 나타납니다.")
         st.session_state.selected_profiles = []
+    with st.expander("🔎 유사 로스팅 검색"):
+        profile_index = get_profile_index()
+        st.caption(f"인덱스 로그 {len(profile_index):,}개")
+        indexable = {name: st.session_state.log_hashes[name] for name in profile_names_sidebar if name in st.session_state.log_hashes and not name.startswith(("[유사] ", "[라이브] "))}
+        if indexable and st.button("로드된 로그를 인덱스에 추가"):
+            added = profile_index.add([(name, key, st.session_state.processed_logs[name]) for name, key in indexable.items()])
+            st.success(f"{added}개 추가됨")
+        if indexable and len(profile_index):
+            reference_name = st.selectbox("기준 로그", list(indexable))
+            search_metric = st.selectbox("거리 방식", INDEX_METRICS, help="l2: 같은 시점끼리 비교, dtw: 밴드 안에서 시간 어긋남 허용")
+            search_k = st.number_input("결과 수", min_value=1, max_value=50, value=5)
+            search_band = st.number_input("DTW 밴드 (격자 칸)", min_value=1, max_value=60, value=10) if search_metric == 'dtw' else 10
+            if st.button("검색"):
+                reference_profile = profile_index.profile(st.session_state.processed_logs[reference_name])
+                st.session_state.similar_results = profile_index.query(reference_profile, int(search_k), search_metric, int(search_band), exclude=[indexable[reference_name]])
+        similar_results = st.session_state.get('similar_results', [])
+        if similar_results:
+            st.dataframe([{"로그": profile_index.entries[row]['name'], "거리": round(distance, 4)} for row, distance in similar_results], hide_index=True)
+            if st.button("비교 차트에 추가"):
+                for row, _ in similar_results:
+                    entry = profile_index.entries[row]; name = f"[유사] {entry['name']}"
+                    st.session_state.processed_logs[name] = profile_index.to_roast_log(row)
+                    st.session_state.log_hashes[name] = f"{entry['content_hash']}:index"
+                    if name not in st.session_state.selected_profiles: st.session_state.selected_profiles.append(name)
+                st.rerun()
+    st.subheader("ROR")
+    st.radio("ROR 표시", ["기기 ROR (ror_above)", "계산 ROR"], key="ror_source", horizontal=True)
+    if st.session_state.ror_source == "계산 ROR":
+        st.selectbox("계산 방식", ROR_METHODS, key="ror_method", help="slope: 구간 최소제곱 기울기, savgol: Savitzky–Golay, moving: 이동 평균, diff: 평활화 없음")
+        st.number_input("평활화 구간 (초)", min_value=1.0, value=DEFAULT_ROR_WINDOW, step=1.0, key="ror_window")
+    st.subheader("그래프 포인트 수")
+    st.number_input("트레이스당 최대 포인트 수 (0 = 원본)", min_value=0, value=2000, step=500, key="point_budget")
+    st.selectbox("다운샘플링 방식", DOWNSAMPLE_METHODS, key="downsample_method")
+    with st.expander("📡 라이브 모드", expanded=st.session_state.get('live_tail') is not None):
+        if st.session_state.get('live_tail') is None:
+            st.text_input("소스", key="live_source", placeholder="/path/log.csv · fifo:/path · tcp://127.0.0.1:9000", help="계속 자라는 CSV 파일, 이름 있는 파이프 또는 로컬 소켓. replay_log.py로 기존 로그를 재생할 수 있습니다.")
+            st.number_input("화면 갱신 간격 (초)", min_value=0.5, value=1.0, step=0.5, key="live_refresh")
+            if st.button("라이브 시작") and st.session_state.live_source:
+                try:
+                    st.session_state.live_tail = LiveTail(open_source(st.session_state.live_source), st.session_state.get('ror_method', DEFAULT_ROR_METHOD), st.session_state.get('ror_window', DEFAULT_ROR_WINDOW))
+                    st.session_state.live_source_active = st.session_state.live_source
+                    st.session_state.live_refresh_active = st.session_state.live_refresh
+                    st.session_state.live_figure = None
+                    st.rerun()
+                except ValueError as e: st.error(str(e))
+        else:
+            st.caption(f"{st.session_state.live_source_active} 추적 중 ({st.session_state.live_refresh_active:g}초마다 갱신)")
+            if st.button("라이브 종료"):
+                stop_live(); st.rerun()
     st.subheader("축 범위 조절")
     axis_ranges = st.session_state.axis_ranges
     col1, col2 = st.columns(2)
@@ -86,158 +299,91 @@ with st.sidebar:
 # --- 파일 업로드 UI (변경 없음) ---
 uploaded_files = st.file_uploader("CSV 로그 파일을 여기에 업로드하세요.", type="csv", accept_multiple_files=True)
 
-# --- 데이터 로딩 및 정제 (변경 없음) ---
+# --- 데이터 로딩 및 정제 (content hash 기반 증분 로딩) ---
 if uploaded_files:
-    current_file_names = sorted([f.name for f in uploaded_files])
-    previous_file_names = st.session_state.get('uploaded_file_names', [])
-    if current_file_names != previous_file_names:
-        st.session_state.processed_logs.clear(); st.session_state.selected_profiles = []
+    current_file_ids = [getattr(f, 'file_id', f.name) for f in uploaded_files]
+    previous_file_ids = st.session_state.get('uploaded_file_ids', [])
+    if current_file_ids != previous_file_ids:
         st.write("---"); st.subheader("⏳ 파일 처리 중...")
-        all_files_valid = True; log_dfs_for_processing = {}
-        for uploaded_file in uploaded_files:
-            profile_name = uploaded_file.name.replace('.csv', '')
-            try:
-                bytes_data = uploaded_file.getvalue()
-                try: decoded_data = bytes_data.decode('utf-8-sig')
-                except UnicodeDecodeError: decoded_data = bytes_data.decode('utf-8')
-                stringio = io.StringIO(decoded_data)
-                stringio.seek(0); header_line = stringio.readline().strip(); headers = [h.strip() for h in header_line.split(',')]
-                stringio.seek(0)
-                df = pd.read_csv(stringio, header=None, skiprows=1, skipinitialspace=True, on_bad_lines='warn')
-                if len(headers) >= len(df.columns): df.columns = headers[:len(df.columns)]
-                else: df.columns = headers + [f'unknown_{i}' for i in range(len(df.columns) - len(headers))]
-                if df.columns[0] != 'time': raise ValueError("첫 열이 'time'이 아닙니다.")
-                roasting_df = pd.DataFrame()
-                if STATE_COL in df.columns:
-                    df[STATE_COL] = df[STATE_COL].astype(str).str.strip().str.lower()
-                    start_mask = df[STATE_COL].str.contains('roasting|ready_for_roast', case=False, na=False)
-                    end_mask = df[STATE_COL].str.contains('cooling|cooldown', case=False, na=False)
-                    start_index = -1
-                    if start_mask.any(): start_index = df[start_mask].index[0]
-                    end_index = len(df)
-                    if end_mask.any(): end_index = df[end_mask].index[0]
-                    if start_index != -1: roasting_df = df.iloc[start_index:end_index].copy()
-                    else:
-                        st.warning(f"'{uploaded_file.name}': 로스팅 시작 상태를 찾을 수 없어 전체 데이터를 사용합니다 (쿨링 제외 시도).")
-                        cooling_mask = df[STATE_COL].str.contains('cooling|cooldown', case=False, na=False)
-                        roasting_df = df[~cooling_mask].copy()
-                else:
-                     st.warning(f"'{uploaded_file.name}': 'state' 열이 없어 전체 데이터를 사용합니다.")
-                     roasting_df = df.copy()
-                if TIME_COL in roasting_df.columns and not roasting_df.empty:
-                    start_time = roasting_df[TIME_COL].iloc[0]
-                    roasting_df[TIME_COL] = roasting_df[TIME_COL] - start_time
-                cols_to_convert = [EXHAUST_TEMP_COL, INLET_TEMP_COL, EXHAUST_ROR_COL, FAN_SPEED_COL, HUMIDITY_COL, HUMIDITY_ROC_COL]
-                for col in cols_to_convert:
-                    if col in roasting_df.columns:
-                        roasting_df[col] = pd.to_numeric(roasting_df[col], errors='coerce')
-                    else:
-                        if col not in [HUMIDITY_COL, HUMIDITY_ROC_COL]:
-                             st.warning(f"'{uploaded_file.name}': 필수 열 '{col}'이 없습니다.")
-                        roasting_df[col] = np.nan
-                log_dfs_for_processing[profile_name] = roasting_df
-            except Exception as e:
-                st.error(f"'{uploaded_file.name}' 파일을 처리하는 중 오류 발생: {e}"); all_files_valid = False
-        if all_files_valid and log_dfs_for_processing:
-            st.session_state.processed_logs = log_dfs_for_processing
-            st.session_state.selected_profiles = list(log_dfs_for_processing.keys())
-            st.session_state.uploaded_file_names = current_file_names
+        logs, hashes, load_warnings, load_errors = ingest_logs(
+            [(f.name, f.getvalue()) for f in uploaded_files],
+            st.session_state.processed_logs, st.session_state.log_hashes, get_log_cache(),
+            transform=RoastLog.from_frame, pool=get_parse_pool(),
+            on_pool_error=lambda error: get_parse_pool.clear())  # 깨진 공유 풀은 버리고 다음 업로드에서 새로 만듭니다.
+        for message in load_warnings: st.warning(message)
+        for message in load_errors: st.error(message)
+        # 일부 파일이 실패해도 읽은 로그는 유지하고 업로드 목록을 기록해 rerun마다 다시 해시/경고하지 않습니다.
+        st.session_state.processed_logs = logs
+        st.session_state.log_hashes = hashes
+        st.session_state.selected_profiles = list(logs.keys())
+        st.session_state.uploaded_file_ids = current_file_ids
+        if not load_errors:  # 오류가 있으면 메시지가 보이도록 다시 실행하지 않습니다.
             st.success("✅ 파일 처리 완료!")
             st.rerun()
 
+# --- 라이브 로스팅 (이 영역만 갱신 간격마다 다시 실행) ---
+if st.session_state.get('live_tail') is not None:
+    st.header("📡 라이브 로스팅")
+    st.fragment(live_panel, run_every=st.session_state.live_refresh_active)()
+
+# --- ROR 소스 적용 (계산 ROR은 설정/로그가 바뀔 때만 다시 계산) ---
+display_logs, display_keys = st.session_state.processed_logs, st.session_state.log_hashes
+if st.session_state.processed_logs and st.session_state.ror_source == "계산 ROR":
+    ror_key = (tuple(st.session_state.log_hashes.items()), st.session_state.ror_method, st.session_state.ror_window)
+    if st.session_state.get('computed_ror', (None,))[0] != ror_key:
+        st.session_state.computed_ror = (ror_key,) + computed_ror_logs(st.session_state.processed_logs, st.session_state.log_hashes, st.session_state.ror_method, st.session_state.ror_window)
+    _, display_logs, display_keys = st.session_state.computed_ror
+
 # --- 그래프 및 분석 패널 UI ---
 if st.session_state.processed_logs:
     st.header("📈 그래프 및 분석")
     graph_col, analysis_col = st.columns([0.7, 0.3])
     max_time = 0
-    selected_logs = {name: st.session_state.processed_logs[name] for name in st.session_state.get('selected_profiles', []) if name in st.session_state.processed_logs}
+    selected_logs = {name: display_logs[name] for name in st.session_state.get('selected_profiles', []) if name in display_logs}
     has_high_scale_fan = False; has_low_scale_fan = False
-    FAN_SCALE_THRESHOLD = 2000
-    for df in selected_logs.values():
-        if TIME_COL in df.columns and not df[TIME_COL].dropna().empty: max_time = max(max_time, df[TIME_COL].max())
-        if FAN_SPEED_COL in df.columns and not df[FAN_SPEED_COL].dropna().empty:
-            max_fan = df[FAN_SPEED_COL].max()
+    for log in selected_logs.values():
+        if not np.isnan(log.max_time): max_time = max(max_time, log.max_time)
+        if log.valid_count(FAN_SPEED_COL) > 0:
+            max_fan = log.channel_max(FAN_SPEED_COL)
             if max_fan > FAN_SCALE_THRESHOLD: has_high_scale_fan = True
             else: has_low_scale_fan = True
     max_time = max(max_time, 1)
 
     with graph_col:
-        # 사용자 지정 비율 적용
-        fig = make_subplots(rows=3, cols=1, shared_xaxes=True, row_heights=[0.7, 0.2, 0.1], vertical_spacing=0.03, specs=[[{"secondary_y": True}], [{"secondary_y": True}], [{"secondary_y": True}]])
         selected_profiles_data = st.session_state.get('selected_profiles', [])
         colors = px.colors.qualitative.Plotly
         color_map = {name: colors[i % len(colors)] for i, name in enumerate(st.session_state.processed_logs.keys())}
-
-        for name in selected_profiles_data:
-            df = st.session_state.processed_logs.get(name); color = color_map.get(name)
-            if df is not None and color is not None:
-                if TIME_COL in df.columns and EXHAUST_TEMP_COL in df.columns:
-                    valid_df_exhaust = df.dropna(subset=[TIME_COL, EXHAUST_TEMP_COL])
-                    if len(valid_df_exhaust) > 1: fig.add_trace(go.Scatter(x=valid_df_exhaust[TIME_COL], y=valid_df_exhaust[EXHAUST_TEMP_COL], mode='lines', name=f'{name} Exhaust Temp', line=dict(color=color, dash='solid')), row=1, col=1, secondary_y=False)
-                if TIME_COL in df.columns and INLET_TEMP_COL in df.columns:
-                     valid_df_inlet = df.dropna(subset=[TIME_COL, INLET_TEMP_COL])
-                     if len(valid_df_inlet) > 1: fig.add_trace(go.Scatter(x=valid_df_inlet[TIME_COL], y=valid_df_inlet[INLET_TEMP_COL], mode='lines', name=f'{name} Inlet Temp', line=dict(color=color, dash='solid')), row=1, col=1, secondary_y=False)
-                if TIME_COL in df.columns and EXHAUST_ROR_COL in df.columns:
-                    valid_df_ror = df.dropna(subset=[TIME_COL, EXHAUST_ROR_COL])
-                    if len(valid_df_ror) > 1:
-                        ror_df = valid_df_ror.iloc[1:];
-                        if not ror_df.empty: fig.add_trace(go.Scatter(x=ror_df[TIME_COL], y=ror_df[EXHAUST_ROR_COL], mode='lines', name=f'{name} ROR', line=dict(color=color, dash='dot'), showlegend=False), row=1, col=1, secondary_y=True)
-                humidity_plotted_row2 = False
-                if TIME_COL in df.columns and HUMIDITY_COL in df.columns:
-                     valid_df_hum = df.dropna(subset=[TIME_COL, HUMIDITY_COL])
-                     if len(valid_df_hum) > 1:
-                         fig.add_trace(go.Scatter(x=valid_df_hum[TIME_COL], y=valid_df_hum[HUMIDITY_COL], mode='lines', name=f'{name} Humidity', line=dict(color=color, dash='solid'), showlegend=True), row=2, col=1, secondary_y=False)
-                         humidity_plotted_row2 = True
-                if TIME_COL in df.columns and HUMIDITY_ROC_COL in df.columns:
-                     valid_df_hum_roc = df.dropna(subset=[TIME_COL, HUMIDITY_ROC_COL])
-                     if len(valid_df_hum_roc) > 1:
-                         fig.add_trace(go.Scatter(x=valid_df_hum_roc[TIME_COL], y=valid_df_hum_roc[HUMIDITY_ROC_COL], mode='lines', name=f'{name} Humidity RoC', line=dict(color=color, dash='solid'), showlegend=True), row=2, col=1, secondary_y=True)
-                         humidity_plotted_row2 = True
-                if TIME_COL in df.columns and FAN_SPEED_COL in df.columns:
-                    valid_df_fan = df.dropna(subset=[TIME_COL, FAN_SPEED_COL])
-                    if len(valid_df_fan) > 1:
-                        is_high_scale = valid_df_fan[FAN_SPEED_COL].max() > FAN_SCALE_THRESHOLD
-                        if not has_high_scale_fan and has_low_scale_fan:
-                            fig.add_trace(go.Scatter(x=valid_df_fan[TIME_COL], y=valid_df_fan[FAN_SPEED_COL], mode='lines', name=f'{name} Fan Speed (Low)', line=dict(color=color, dash='solid'), showlegend=True), row=3, col=1, secondary_y=False)
-                        elif is_high_scale:
-                            fig.add_trace(go.Scatter(x=valid_df_fan[TIME_COL], y=valid_df_fan[FAN_SPEED_COL], mode='lines', name=f'{name} Fan Speed (High)', line=dict(color=color, dash='solid'), showlegend=True), row=3, col=1, secondary_y=False)
-                        else:
-                            fig.add_trace(go.Scatter(x=valid_df_fan[TIME_COL], y=valid_df_fan[FAN_SPEED_COL], mode='lines', name=f'{name} Fan Speed (Low)', line=dict(color=color, dash='solid'), showlegend=True), row=3, col=1, secondary_y=True)
-
-        selected_time_int = int(st.session_state.get('selected_time', 0)); fig.add_vline(x=selected_time_int, line_width=1, line_dash="dash", line_color="grey")
-        axis_ranges = st.session_state.axis_ranges
-        fig.update_layout(height=1000, legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-        fig.update_xaxes(range=axis_ranges['x'], showticklabels=False, dtick=60, row=1, col=1)
-        fig.update_xaxes(range=axis_ranges['x'], showticklabels=False, dtick=60, row=2, col=1)
-        fig.update_xaxes(range=axis_ranges['x'], title_text='시간 (초)', dtick=60, row=3, col=1)
-        fig.update_yaxes(title_text="온도 (°C)", range=axis_ranges['y_temp'], dtick=10, row=1, col=1, secondary_y=False)
-        fig.update_yaxes(title_text="ROR (℃/sec)", range=axis_ranges['y_ror'], showgrid=False, row=1, col=1, secondary_y=True)
-        fig.update_yaxes(title_text="Abs Humidity", range=axis_ranges['y_hum1'], row=2, col=1, secondary_y=False)
-        fig.update_yaxes(title_text="Humidity RoC", range=axis_ranges['y_hum2'], showgrid=False, row=2, col=1, secondary_y=True)
-        if not has_high_scale_fan and has_low_scale_fan:
-            fig.update_yaxes(title_text="Fan Speed (Low)", range=axis_ranges['y_fan2'], row=3, col=1, secondary_y=False)
-            fig.update_yaxes(visible=False, row=3, col=1, secondary_y=True)
-        elif has_high_scale_fan and not has_low_scale_fan:
-            fig.update_yaxes(title_text="Fan Speed (High)", range=axis_ranges['y_fan1'], row=3, col=1, secondary_y=False)
-            fig.update_yaxes(visible=False, row=3, col=1, secondary_y=True)
-        elif has_high_scale_fan and has_low_scale_fan:
-            fig.update_yaxes(title_text="Fan Speed (High)", range=axis_ranges['y_fan1'], row=3, col=1, secondary_y=False)
-            fig.update_yaxes(title_text="Fan Speed (Low)", range=axis_ranges['y_fan2'], showgrid=False, row=3, col=1, secondary_y=True)
-        else:
-            fig.update_yaxes(title_text="Fan Speed (High)", range=axis_ranges['y_fan1'], row=3, col=1, secondary_y=False)
-            fig.update_yaxes(title_text="Fan Speed (Low)", range=axis_ranges['y_fan2'], showgrid=False, row=3, col=1, secondary_y=True)
+        render_start = time.perf_counter()
+        trace_key = (
+            tuple((name, display_keys.get(name, name), color_map.get(name)) for name in selected_profiles_data),
+            has_high_scale_fan, has_low_scale_fan, st.session_state.point_budget, st.session_state.downsample_method,
+        )
+        trace_layer = st.session_state.get('trace_layer')
+        trace_layer_hit = trace_layer is not None and trace_layer[0] == trace_key
+        if not trace_layer_hit:
+            fig, plot_points = build_trace_layer(selected_profiles_data, display_logs, display_keys, color_map, has_high_scale_fan, has_low_scale_fan)
+            st.session_state.trace_layer = (trace_key, fig, plot_points)
+        _, fig, plot_points = st.session_state.trace_layer
+        trace_done = time.perf_counter()
+        apply_layout(fig, st.session_state.axis_ranges, int(st.session_state.get('selected_time', 0)), has_high_scale_fan, has_low_scale_fan)
+        layout_done = time.perf_counter()
         st.plotly_chart(fig, use_container_width=True)
+        chart_done = time.perf_counter()
+        if plot_points[0]: st.caption(f"표시 포인트 {plot_points[1]:,} / 원본 {plot_points[0]:,}")
+        st.caption(
+            f"⏱️ 트레이스 {'캐시' if trace_layer_hit else '생성'} {(trace_done - render_start) * 1000:.1f} ms · "
+            f"레이아웃 {(layout_done - trace_done) * 1000:.1f} ms · 차트 전송 {(chart_done - layout_done) * 1000:.1f} ms"
+        )
 
     # --- 여기가 수정된 부분: 분석 패널 코드 복원 ---
     with analysis_col:
         st.subheader("🔍 분석 정보"); st.markdown("---")
         st.write("**총 로스팅 시간**")
         for name in selected_profiles_data: # selected_profiles_data 사용
-            df = st.session_state.processed_logs.get(name) # processed_logs 사용
-            if df is not None and TIME_COL in df.columns:
-                valid_df = df.dropna(subset=[TIME_COL])
-                if not valid_df.empty:
-                    total_time = valid_df[TIME_COL].max(); time_str = f"{int(total_time // 60)}분 {int(total_time % 60)}초"
+            log = st.session_state.processed_logs.get(name) # processed_logs 사용
+            if log is not None:
+                if not np.isnan(log.max_time):
+                    total_time = log.max_time; time_str = f"{int(total_time // 60)}분 {int(total_time % 60)}초"
                     st.markdown(f"**{name}**: <span style='font-size: 1.1em;'>{time_str}</span>", unsafe_allow_html=True)
         st.markdown("---")
         def update_slider_time():
@@ -250,31 +396,26 @@ if st.session_state.processed_logs:
         st.slider("시간 선택 (초)", 0, slider_max_time, selected_time_val, 1, key="time_slider", on_change=update_slider_time)
         st.write(""); st.write("**선택된 시간 상세 정보**")
         selected_time = st.session_state.selected_time; st.markdown(f"#### {int(selected_time // 60)}분 {int(selected_time % 60):02d}초 ({selected_time}초)")
+        # 선택된 로그 조합이 바뀔 때만 조회 테이블을 다시 만들고, 슬라이더 이동 시에는 한 번의 조회만 수행합니다.
+        lookup_names = [name for name in selected_profiles_data if name in display_logs]
+        lookup_key = tuple((name, display_keys.get(name)) for name in lookup_names)
+        if st.session_state.get('lookup_key') != lookup_key:
+            st.session_state.lookup_table = LookupTable([display_logs[name] for name in lookup_names], CHANNELS)
+            st.session_state.lookup_key = lookup_key
+        hover_values = dict(zip(lookup_names, st.session_state.lookup_table.at(selected_time)[:, :, 0]))
         for name in selected_profiles_data: # selected_profiles_data 사용
             st.markdown(f"<p style='margin-bottom: 0.2em;'><strong>{name}</strong></p>", unsafe_allow_html=True)
             exhaust_temp_str, inlet_temp_str, ror_str = "--", "--", "--"
             fan_speed_str, humidity_str, humidity_roc_str = "--", "--", "--"
-            df = st.session_state.processed_logs.get(name) # processed_logs 사용
-            if df is not None:
-                if TIME_COL not in df.columns: continue
-                if EXHAUST_TEMP_COL in df.columns:
-                    valid_exhaust = df.dropna(subset=[TIME_COL, EXHAUST_TEMP_COL])
-                    if len(valid_exhaust) > 1 and selected_time <= valid_exhaust[TIME_COL].max(): hover_exhaust = np.interp(selected_time, valid_exhaust[TIME_COL], valid_exhaust[EXHAUST_TEMP_COL]); exhaust_temp_str = f"{hover_exhaust:.1f}℃"
-                if INLET_TEMP_COL in df.columns:
-                    valid_inlet = df.dropna(subset=[TIME_COL, INLET_TEMP_COL])
-                    if len(valid_inlet) > 1 and selected_time <= valid_inlet[TIME_COL].max(): hover_inlet = np.interp(selected_time, valid_inlet[TIME_COL], valid_inlet[INLET_TEMP_COL]); inlet_temp_str = f"{hover_inlet:.1f}℃"
-                if EXHAUST_ROR_COL in df.columns:
-                    valid_ror = df.dropna(subset=[TIME_COL, EXHAUST_ROR_COL])
-                    if len(valid_ror) > 1 and selected_time <= valid_ror[TIME_COL].max(): hover_ror = np.interp(selected_time, valid_ror[TIME_COL], valid_ror[EXHAUST_ROR_COL]); ror_str = f"{hover_ror:.3f}℃/sec"
-                if FAN_SPEED_COL in df.columns:
-                    valid_fan = df.dropna(subset=[TIME_COL, FAN_SPEED_COL])
-                    if len(valid_fan) > 1 and selected_time <= valid_fan[TIME_COL].max(): hover_fan = np.interp(selected_time, valid_fan[TIME_COL], valid_fan[FAN_SPEED_COL]); fan_speed_str = f"{hover_fan:.1f}"
-                if HUMIDITY_COL in df.columns:
-                    valid_hum = df.dropna(subset=[TIME_COL, HUMIDITY_COL])
-                    if len(valid_hum) > 1 and selected_time <= valid_hum[TIME_COL].max(): hover_hum = np.interp(selected_time, valid_hum[TIME_COL], valid_hum[HUMIDITY_COL]); humidity_str = f"{hover_hum:.2f}"
-                if HUMIDITY_ROC_COL in df.columns:
-                     valid_hum_roc = df.dropna(subset=[TIME_COL, HUMIDITY_ROC_COL])
-                     if len(valid_hum_roc) > 1 and selected_time <= valid_hum_roc[TIME_COL].max(): hover_hum_roc = np.interp(selected_time, valid_hum_roc[TIME_COL], valid_hum_roc[HUMIDITY_ROC_COL]); humidity_roc_str = f"{hover_hum_roc:.4f}"
+            hover = hover_values.get(name)
+            if hover is not None:
+                hover_exhaust, hover_inlet, hover_ror, hover_fan, hover_hum, hover_hum_roc = hover
+                if not np.isnan(hover_exhaust): exhaust_temp_str = f"{hover_exhaust:.1f}℃"
+                if not np.isnan(hover_inlet): inlet_temp_str = f"{hover_inlet:.1f}℃"
+                if not np.isnan(hover_ror): ror_str = f"{hover_ror:.3f}℃/sec"
+                if not np.isnan(hover_fan): fan_speed_str = f"{hover_fan:.1f}"
+                if not np.isnan(hover_hum): humidity_str = f"{hover_hum:.2f}"
+                if not np.isnan(hover_hum_roc): humidity_roc_str = f"{hover_hum_roc:.4f}"
             st.markdown(f"<p style='margin:0; font-size: 0.95em;'>&nbsp;&nbsp;• Exhaust Temp: {exhaust_temp_str}</p>", unsafe_allow_html=True)
             st.markdown(f"<p style='margin:0; font-size: 0.95em;'>&nbsp;&nbsp;• Inlet Temp: {inlet_temp_str}</p>", unsafe_allow_html=True)
             st.markdown(f"<p style='margin:0; font-size: 0.95em;'>&nbsp;&nbsp;• Exhaust ROR: {ror_str}</p>", unsafe_allow_html=True)
@@ -0,0 +1,48 @@
+"""다운샘플링 전후 Plotly 그림 JSON 크기와 직렬화 시간을 비교합니다.
+
+    python -m benchmarks.bench_downsample --logs 30 --budget 1000
+"""
+import argparse
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+from benchmarks.synthetic_logs import make_log_files
+from downsample import DOWNSAMPLE_METHODS, downsample
+from log_loader import parse_log_bytes
+from roast_store import CHANNELS, RoastLog
+
+
+def build_figure(logs, budget, method):
+    fig = go.Figure(); peaks_kept = True
+    for log in logs:
+        for col in CHANNELS:
+            t, y = log.valid_series(col)
+            if len(t) <= 1: continue
+            t_plot, y_plot = downsample(t, y, budget, method)
+            peaks_kept &= bool(y_plot.max() == y.max() and y_plot.min() == y.min())
+            fig.add_trace(go.Scatter(x=t_plot, y=y_plot, mode='lines'))
+    return fig, peaks_kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logs', type=int, default=30)
+    parser.add_argument('--budget', type=int, default=1000)
+    parser.add_argument('--roast-seconds', type=int, default=1800)
+    parser.add_argument('--sample-hz', type=int, default=4)
+    args = parser.parse_args()
+
+    files = make_log_files(args.logs, roast_seconds=args.roast_seconds, sample_hz=args.sample_hz)
+    logs = [RoastLog.from_frame(parse_log_bytes(name, data)[0]) for name, data in files]
+    print(f"가상 로그 {args.logs}개, 로그당 {np.mean([len(log) for log in logs]):.0f}행, 트레이스당 예산 {args.budget}")
+    for label, budget, method in [('원본', 0, 'minmax')] + [(m, args.budget, m) for m in DOWNSAMPLE_METHODS]:
+        start = time.perf_counter(); fig, peaks_kept = build_figure(logs, budget, method); build = time.perf_counter() - start
+        start = time.perf_counter(); payload = fig.to_json(); serialise = time.perf_counter() - start
+        points = sum(len(trace.x) for trace in fig.data)
+        print(f"{label:>7}: 포인트 {points:>9,}, JSON {len(payload) / 1024 / 1024:7.2f} MB, 생성 {build * 1000:7.1f} ms, 직렬화 {serialise * 1000:7.1f} ms, 피크 유지 {peaks_kept}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""라이브 모드 tick 한 번의 처리 시간을 전체 재파싱과 비교합니다 (재생 속도와 무관하게 sleep 없이 측정).
+
+    python -m benchmarks.bench_live_tail --roast-seconds 480 900 1800 --rows-per-tick 2
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_logs import make_log_bytes
+from live_tail import LiveTail, open_source
+from log_loader import EXHAUST_TEMP_COL, TIME_COL, parse_log_bytes
+from replay_log import split_log
+from ror import ror_for_series
+
+
+def legacy_tick(bytes_so_far):
+    # 라이브 모드 없이 같은 화면을 얻는 방법: 매 tick 파일 전체를 다시 파싱하고 ROR을 다시 계산
+    df, _ = parse_log_bytes('live.csv', bytes_so_far)
+    if len(df) > 1: ror_for_series([(df[TIME_COL].to_numpy(dtype='float64'), df[EXHAUST_TEMP_COL].to_numpy(dtype='float64'))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--roast-seconds', type=int, nargs='+', default=[480, 900, 1800])
+    parser.add_argument('--rows-per-tick', type=int, default=2, help="tick마다 추가되는 행 수 (2 Hz 로그의 1초 갱신 = 2)")
+    parser.add_argument('--legacy-ticks', type=int, default=50, help="전체 재파싱은 로그 끝부분 tick 몇 개만 측정")
+    args = parser.parse_args()
+
+    print(f"{'로스팅 (초)':>10} | {'tick 수':>7} | {'증분 중앙값 (ms)':>15} | {'증분 p95 (ms)':>13} | {'전체 재파싱 (ms)':>15}")
+    for roast_seconds in args.roast_seconds:
+        header, rows = split_log(make_log_bytes(0, roast_seconds=roast_seconds))
+        ticks = [b''.join(line for _, line in rows[i:i + args.rows_per_tick]) for i in range(0, len(rows), args.rows_per_tick)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'live.csv')
+            with open(path, 'wb') as f:
+                f.write(header); f.flush()
+                tail = LiveTail(open_source(path)); tail.poll()
+                latencies = []
+                for chunk in ticks:
+                    f.write(chunk); f.flush()
+                    start = time.perf_counter(); tail.poll(); latencies.append(time.perf_counter() - start)
+        ms = np.array(latencies) * 1000
+        legacy = []
+        for i in range(max(0, len(ticks) - args.legacy_ticks), len(ticks)):
+            data = header + b''.join(ticks[:i + 1])
+            start = time.perf_counter(); legacy_tick(data); legacy.append(time.perf_counter() - start)
+        print(f"{roast_seconds:>10} | {len(ticks):>7} | {np.median(ms):15.3f} | {np.percentile(ms, 95):13.3f} | {np.median(legacy) * 1000:15.2f}")
+
+
+if __name__ == '__main__':
+    main()
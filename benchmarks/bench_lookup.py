@@ -0,0 +1,54 @@
+"""슬라이더 상세 패널 한 번 갱신에 드는 조회 시간을 로그 수별로 비교합니다.
+
+    python -m benchmarks.bench_lookup --logs 1 10 30 60 100
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_logs import make_log_files
+from log_loader import TIME_COL, parse_log_bytes
+from roast_store import CHANNELS, LookupTable, RoastLog
+
+
+def legacy_lookup(frames, selected_time):
+    # 변경 전 분석 패널: 채널마다 dropna 후 np.interp
+    values = []
+    for df in frames:
+        for col in CHANNELS:
+            valid = df.dropna(subset=[TIME_COL, col])
+            if len(valid) > 1 and selected_time <= valid[TIME_COL].max(): values.append(np.interp(selected_time, valid[TIME_COL], valid[col]))
+    return values
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter(); fn(); best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logs', type=int, nargs='+', default=[1, 10, 30, 60, 100])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    files = make_log_files(max(args.logs))
+    all_frames = [parse_log_bytes(name, data)[0] for name, data in files]
+    all_logs = [RoastLog.from_frame(df) for df in all_frames]
+    batch = np.arange(0, 480, 1.0)
+    print(f"{'로그 수':>6} | {'기존 (ms)':>10} | {'조회 테이블 (ms)':>14} | {'테이블 생성 (ms)':>14} | {'480개 시점 일괄 (ms)':>18}")
+    for n in args.logs:
+        frames = all_frames[:n]; logs = all_logs[:n]
+        table = LookupTable(logs)
+        legacy = best_of(lambda: legacy_lookup(frames, 200), max(1, args.repeat // 4))
+        indexed = best_of(lambda: table.at(200), args.repeat)
+        build = best_of(lambda: LookupTable(logs), max(1, args.repeat // 4))
+        batched = best_of(lambda: table.at(batch), max(1, args.repeat // 4))
+        print(f"{n:>6} | {legacy * 1000:10.2f} | {indexed * 1000:14.3f} | {build * 1000:14.2f} | {batched * 1000:18.2f}")
+
+
+if __name__ == '__main__':
+    main()
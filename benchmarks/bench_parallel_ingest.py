@@ -0,0 +1,39 @@
+"""순차 파싱과 병렬 파싱의 처리 시간을 비교합니다.
+
+    python -m benchmarks.bench_parallel_ingest --logs 60 --workers 8
+"""
+import argparse
+import os
+import time
+
+from benchmarks.synthetic_logs import make_log_files
+from log_loader import parse_logs_parallel
+
+
+def run(files, max_workers, use_processes):
+    start = time.perf_counter()
+    results = parse_logs_parallel(files, max_workers=max_workers, use_processes=use_processes)
+    elapsed = time.perf_counter() - start
+    assert all(error is None for _, _, error in results)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logs', type=int, default=60)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    files = make_log_files(args.logs)
+    print(f"가상 로그 {args.logs}개, 총 {sum(len(b) for _, b in files) / 1e6:.1f} MB, 워커 {args.workers}개")
+    modes = [('순차', 1, False), ('스레드 풀', args.workers, False), ('프로세스 풀', args.workers, True)]
+    serial = None
+    for label, workers, use_processes in modes:
+        best = min(run(files, workers, use_processes) for _ in range(args.repeat))
+        serial = serial or best
+        print(f"{label:>8}: {best * 1000:8.1f} ms  (x{serial / best:.2f})")
+
+
+if __name__ == '__main__':
+    main()
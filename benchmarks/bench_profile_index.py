@@ -0,0 +1,55 @@
+"""유사 로스팅 검색 한 번에 드는 시간을 인덱스 크기별로 측정합니다.
+
+    python -m benchmarks.bench_profile_index --sizes 1000 10000 50000
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_logs import make_log_files
+from log_loader import parse_log_bytes
+from profile_index import ProfileIndex
+from roast_store import RoastLog
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter(); fn(); best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--base-logs', type=int, default=50, help="노이즈를 더해 복제할 원본 합성 로그 수")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--band', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    base = [RoastLog.from_frame(parse_log_bytes(name, data)[0]) for name, data in make_log_files(args.base_logs)]
+    rng = np.random.default_rng(0)
+    print(f"{'인덱스 크기':>10} | {'추가 (s)':>8} | {'파일 (MB)':>9} | {'L2 (ms)':>8} | {'DTW (ms)':>8}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as index_dir:
+            index = ProfileIndex(index_dir)
+            start = time.perf_counter()
+            for chunk_start in range(0, size, 1000):
+                items = []
+                for i in range(chunk_start, min(size, chunk_start + 1000)):
+                    log = base[i % len(base)]
+                    jitter = rng.normal(0.0, 1.0, log.values.shape).astype(np.float32)
+                    items.append((f'synthetic_{i:06d}', f'{i:064x}', RoastLog(log.time, log.values + jitter, log.channels)))
+                index.add(items)
+            build = time.perf_counter() - start
+            query = index.profile(base[0])
+            l2 = best_of(lambda: index.query(query, args.k, 'l2'), args.repeat)
+            dtw = best_of(lambda: index.query(query, args.k, 'dtw', args.band), args.repeat)
+            print(f"{size:>10} | {build:8.2f} | {index.matrix.nbytes / 2**20:9.1f} | {l2 * 1000:8.2f} | {dtw * 1000:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""기존 pd.read_csv 경로와 타입 지정 리더(read_log_csv)의 파싱 시간과 메모리를 비교합니다.
+
+    python -m benchmarks.bench_reader --logs 20
+"""
+import argparse
+import io
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic_logs import make_log_files
+from log_loader import NUMERIC_COLS, STATE_COL, read_log_csv
+
+
+def legacy_read(bytes_data):
+    # 변경 전 app.py의 읽기 + 변환 경로
+    decoded_data = bytes_data.decode('utf-8-sig')
+    stringio = io.StringIO(decoded_data)
+    headers = [h.strip() for h in stringio.readline().strip().split(',')]
+    stringio.seek(0)
+    df = pd.read_csv(stringio, header=None, skiprows=1, skipinitialspace=True, on_bad_lines='warn')
+    df.columns = headers[:len(df.columns)]
+    df[STATE_COL] = df[STATE_COL].astype(str).str.strip().str.lower()
+    for col in NUMERIC_COLS: df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def measure(reader, files, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = [reader(bytes_data) for _, bytes_data in files]
+        best = min(best, time.perf_counter() - start)
+    memory = sum(df.memory_usage(deep=True).sum() for df in frames)
+    return best, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logs', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    files = make_log_files(args.logs)
+    legacy_time, legacy_memory = measure(legacy_read, files, args.repeat)
+    typed_time, typed_memory = measure(read_log_csv, files, args.repeat)
+    print(f"가상 로그 {args.logs}개")
+    print(f"기존 경로  : {legacy_time / args.logs * 1000:7.2f} ms/로그, {legacy_memory / args.logs / 1024:8.1f} KiB/로그")
+    print(f"타입 리더  : {typed_time / args.logs * 1000:7.2f} ms/로그, {typed_memory / args.logs / 1024:8.1f} KiB/로그")
+    print(f"속도 x{legacy_time / typed_time:.2f}, 메모리 x{typed_memory / legacy_memory:.2f}")
+
+
+if __name__ == '__main__':
+    main()
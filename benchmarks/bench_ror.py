@@ -0,0 +1,53 @@
+"""기존 DataFrame 단위 calculate_ror과 2차원 배치 ROR 엔진의 처리 시간을 비교합니다.
+
+    python -m benchmarks.bench_ror --logs 100
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_logs import make_log_files
+from log_loader import EXHAUST_TEMP_COL, TIME_COL, parse_log_bytes
+from ror import ROR_METHODS, ror_for_series
+
+
+def legacy_calculate_ror(df):
+    # 변경 전 app.py의 calculate_ror (비교용)
+    if 'temp above' not in df.columns or 'time' not in df.columns: df['ror_calc'] = np.nan; return df
+    if df['temp above'].isnull().all(): df['ror_calc'] = np.nan; return df
+    last_valid_index = df['temp above'].last_valid_index()
+    if last_valid_index is None: df['ror_calc'] = np.nan; return df
+    calc_df = df.loc[0:last_valid_index].copy()
+    delta_temp = calc_df['temp above'].diff(); delta_time = calc_df['time'].diff()
+    ror = (delta_temp / delta_time).replace([np.inf, -np.inf], 0).fillna(0)
+    calc_df['ror_calc'] = ror; df['ror_calc'] = np.nan; df.update(calc_df)
+    return df
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter(); result = fn(); best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logs', type=int, default=100)
+    parser.add_argument('--window', type=float, default=10.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    frames = [parse_log_bytes(name, data)[0] for name, data in make_log_files(args.logs)]
+    series = [(df[TIME_COL].to_numpy(dtype='float64'), df[EXHAUST_TEMP_COL].to_numpy(dtype='float64')) for df in frames]
+    legacy, results = best_of(lambda: [legacy_calculate_ror(df.copy())['ror_calc'].to_numpy() for df in frames], args.repeat)
+    print(f"가상 로그 {args.logs}개, 평활화 구간 {args.window:.0f}초")
+    print(f"{'calculate_ror':>14}: {legacy * 1000:8.1f} ms, ROR 표준편차 {np.nanmean([np.nanstd(r) for r in results]):.3f}")
+    for method in ROR_METHODS:
+        elapsed, results = best_of(lambda: ror_for_series(series, method, args.window), args.repeat)
+        print(f"{method:>14}: {elapsed * 1000:8.1f} ms (x{legacy / elapsed:.2f}), ROR 표준편차 {np.nanmean([np.nanstd(r) for r in results]):.3f}")
+
+
+if __name__ == '__main__':
+    main()
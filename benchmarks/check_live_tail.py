@@ -0,0 +1,71 @@
+"""LiveTail 자체 점검: 합성 로그를 임의 크기 바이트 조각으로 이어 쓰면서 증분 ROR이 일괄 계산과 같은지 확인합니다.
+
+    python -m benchmarks.check_live_tail --seeds 0 1 2 --max-chunk 400
+
+모든 ROR 방식에 대해 (1) ror[:ror_final]이 이후 poll에서 바뀌지 않고, (2) 마지막 ROR이 전체 로그의 compute_ror와
+허용 오차 안에서 같은지 검사합니다. 실패하면 0이 아닌 코드로 끝납니다.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks.synthetic_logs import make_log_bytes
+from live_tail import LiveTail, open_source
+from log_loader import EXHAUST_TEMP_COL, TIME_COL, parse_log_bytes
+from ror import DEFAULT_ROR_WINDOW, ROR_METHODS, align, compute_ror
+
+
+def check(data, method, window, rng, max_chunk, tolerance):
+    """문제 목록을 돌려줍니다 (비어 있으면 통과)."""
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'live.csv')
+        open(path, 'wb').close()
+        tail = LiveTail(open_source(path), method, window)
+        with open(path, 'ab') as f:
+            pos = 0
+            while pos < len(data):
+                size = int(rng.integers(1, max_chunk + 1))
+                f.write(data[pos:pos + size]); f.flush(); pos += size
+                final = tail.ror_final; snapshot = tail.ror[:final].copy()
+                tail.poll()
+                if not np.array_equal(tail.ror[:final], snapshot, equal_nan=True):
+                    problems.append(f"{pos}바이트 시점에 확정 ROR[:{final}]이 바뀌었습니다."); break
+        tail.close()
+    if tail.step is None: return problems + ["ROR 격자가 정해지지 않았습니다."]
+    df, _ = parse_log_bytes('live.csv', data)
+    _, matrix = align([(df[TIME_COL].to_numpy(dtype='float64'), df[EXHAUST_TEMP_COL].to_numpy(dtype='float64'))], tail.step)
+    expected = compute_ror(matrix, tail.step, method, window)[0]
+    _, ror = tail.ror_series()
+    if len(ror) != len(expected): return problems + [f"격자 길이 {len(ror)} ≠ 일괄 계산 {len(expected)}"]
+    if not np.array_equal(np.isnan(ror), np.isnan(expected)): problems.append("NaN 위치가 일괄 계산과 다릅니다.")
+    both = np.isfinite(ror) & np.isfinite(expected)
+    error = float(np.abs(ror[both] - expected[both]).max()) if both.any() else 0.0
+    if error > tolerance: problems.append(f"일괄 계산과의 최대 차이 {error:.3g} > {tolerance:g}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0, 1, 2])
+    parser.add_argument('--roast-seconds', type=int, default=480)
+    parser.add_argument('--max-chunk', type=int, default=400, help="한 번에 이어 쓰는 최대 바이트 수")
+    parser.add_argument('--window', type=float, default=DEFAULT_ROR_WINDOW)
+    parser.add_argument('--tolerance', type=float, default=1e-9)
+    args = parser.parse_args()
+
+    failed = False
+    for seed in args.seeds:
+        data = make_log_bytes(seed, roast_seconds=args.roast_seconds)
+        for method in ROR_METHODS:
+            problems = check(data, method, args.window, np.random.default_rng(seed), args.max_chunk, args.tolerance)
+            print(f"seed {seed} · {method:>6}: {'통과' if not problems else '; '.join(problems)}")
+            failed |= bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
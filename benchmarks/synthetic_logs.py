@@ -0,0 +1,45 @@
+import numpy as np
+
+# --- 벤치마크용 가상 Ikawa 로그 생성 ---
+IKAWA_HEADER = (
+    "time, fan set, setpoint, fan speed, temp above, state, heater, p, i, d, temp below, temp board, j, "
+    "ror_above, abs_humidity, abs_humidity_roc, abs_humidity_roc_direction, adfc_timestamp, end_timestamp, "
+    "tdf_error, pressure, total_moisture_loss, moisture_loss_rate"
+)
+
+
+def make_log_frame(seed=0, roast_seconds=480, idle_seconds=20, cooling_seconds=120, sample_hz=2):
+    """Ikawa CSV 한 개 분량의 열 값을 dict로 만듭니다 (열 이름 -> 배열)."""
+    rng = np.random.default_rng(seed)
+    n = (idle_seconds + roast_seconds + cooling_seconds) * sample_hz
+    t = np.arange(n) / sample_hz
+    roast_t = np.clip(t - idle_seconds, 0, roast_seconds)
+    temp = 150 + 80 * (1 - np.exp(-roast_t / 200)) + 0.1 * roast_t + rng.normal(0, 0.4, n)
+    cooling = t >= idle_seconds + roast_seconds
+    temp[cooling] -= (t[cooling] - idle_seconds - roast_seconds) * 1.2
+    state = np.where(t < idle_seconds, 'ready_to_blow', np.where(cooling, 'cooling', 'roasting'))
+    fan = 11000 + rng.normal(0, 50, n) + seed % 3 * 500
+    ror = np.gradient(temp, t) + rng.normal(0, 0.05, n)
+    humidity = 15 - 5 * roast_t / roast_seconds + rng.normal(0, 0.1, n)
+    return {
+        'time': np.round(t + 1000, 2), 'fan set': np.full(n, 60), 'setpoint': np.round(temp + 5, 1),
+        'fan speed': np.round(fan), 'temp above': np.round(temp, 1), 'state': state,
+        'heater': rng.integers(0, 100, n), 'p': rng.integers(0, 10, n), 'i': rng.integers(0, 10, n), 'd': rng.integers(0, 10, n),
+        'temp below': np.round(temp + 40, 1), 'temp board': np.round(40 + rng.normal(0, 1, n), 1), 'j': np.ones(n, dtype=int),
+        'ror_above': np.round(ror, 3), 'abs_humidity': np.round(humidity, 2), 'abs_humidity_roc': np.round(np.gradient(humidity, t), 4),
+        'abs_humidity_roc_direction': np.ones(n, dtype=int), 'adfc_timestamp': np.zeros(n, dtype=int), 'end_timestamp': np.zeros(n, dtype=int),
+        'tdf_error': np.zeros(n, dtype=int), 'pressure': np.round(1000 + rng.normal(0, 1, n), 1),
+        'total_moisture_loss': np.round(roast_t / roast_seconds * 12, 2), 'moisture_loss_rate': np.round(rng.normal(0.02, 0.005, n), 4),
+    }
+
+
+def make_log_bytes(seed=0, **kwargs):
+    columns = make_log_frame(seed, **kwargs)
+    values = list(columns.values())
+    lines = [IKAWA_HEADER]
+    lines.extend(', '.join(str(col[i]) for col in values) for i in range(len(values[0])))
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def make_log_files(n_logs, **kwargs):
+    return [(f'synthetic_{i:04d}.csv', make_log_bytes(seed=i, **kwargs)) for i in range(n_logs)]
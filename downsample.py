@@ -0,0 +1,70 @@
+import warnings
+
+import numpy as np
+
+# --- 그래프 트레이스 다운샘플링 ---
+DOWNSAMPLE_METHODS = ['minmax', 'lttb']
+
+
+def _with_extremes(indices, y):
+    # 전역 최댓값/최솟값(온도 피크, ROR 급변 구간)은 항상 남깁니다.
+    finite = np.isfinite(y)
+    if not finite.any(): return indices
+    extremes = [np.nanargmax(np.where(finite, y, np.nan)), np.nanargmin(np.where(finite, y, np.nan))]
+    return np.unique(np.concatenate([indices, extremes]))
+
+
+def minmax_indices(y, budget):
+    """구간마다 최솟값과 최댓값 위치를 남깁니다. 처음과 끝 점은 항상 포함됩니다."""
+    n = len(y)
+    if budget <= 0 or n <= budget: return np.arange(n)
+    n_buckets = max(1, (budget - 2) // 2)
+    size = int(np.ceil(n / n_buckets)); n_buckets = int(np.ceil(n / size))
+    padded = np.full(n_buckets * size, np.nan, dtype=np.float64); padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    all_nan = np.isnan(buckets).all(axis=1)
+    buckets[all_nan, 0] = 0.0  # nanargmax 경고 방지용 (해당 구간은 아래에서 제외)
+    offsets = np.arange(n_buckets) * size
+    picks = np.concatenate([(np.nanargmin(buckets, axis=1) + offsets)[~all_nan], (np.nanargmax(buckets, axis=1) + offsets)[~all_nan], [0, n - 1]])
+    return np.unique(np.clip(picks, 0, n - 1))
+
+
+def lttb_indices(x, y, budget):
+    """Largest-Triangle-Three-Buckets를 구간 단위로 한 번에 계산합니다.
+
+    원래 LTTB는 앞 구간에서 선택된 점을 기준으로 삼아 순차적으로 계산하지만,
+    여기서는 앞 구간의 평균점을 기준으로 삼아 모든 구간을 NumPy 배열 연산 한 번으로 처리합니다.
+    """
+    n = len(y)
+    if budget <= 0 or n <= max(budget, 3): return np.arange(n)
+    budget = max(budget, 3)  # 처음/끝 점과 구간 한 개가 최소 단위입니다.
+    x = np.asarray(x, dtype=np.float64); y = np.asarray(y, dtype=np.float64)
+    inner = n - 2
+    size = int(np.ceil(inner / (budget - 2))); n_buckets = int(np.ceil(inner / size))
+    bx = np.full(n_buckets * size, np.nan); bx[:inner] = x[1:-1]; bx = bx.reshape(n_buckets, size)
+    by = np.full(n_buckets * size, np.nan); by[:inner] = y[1:-1]; by = by.reshape(n_buckets, size)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # 모두 NaN인 구간의 "Mean of empty slice"
+        avg_x = np.nanmean(bx, axis=1); avg_y = np.nanmean(by, axis=1)
+    ax = np.concatenate([[x[0]], avg_x[:-1]])[:, None]; ay = np.concatenate([[y[0]], avg_y[:-1]])[:, None]
+    cx = np.concatenate([avg_x[1:], [x[-1]]])[:, None]; cy = np.concatenate([avg_y[1:], [y[-1]]])[:, None]
+    area = np.abs((ax - cx) * (by - ay) - (ax - bx) * (cy - ay))
+    area = np.where(np.isnan(area), -1.0, area)
+    picks = np.argmax(area, axis=1) + np.arange(n_buckets) * size + 1
+    return np.concatenate([[0], picks[picks < n - 1], [n - 1]])
+
+
+def downsample(x, y, budget, method='minmax'):
+    """(x, y)를 최대 약 budget개 점으로 줄입니다. budget이 0 이하이면 원본을 그대로 돌려줍니다."""
+    n = len(y)
+    if budget <= 0 or n <= budget: return x, y
+    if method == 'lttb':
+        # LTTB는 구간보다 좁은 골(1차 크랙 때의 ROR 하락 등)을 건너뛸 수 있으므로
+        # 예산의 1/4로 구간별 최솟값/최댓값 위치도 함께 남깁니다.
+        extrema_budget = budget // 4
+        indices = lttb_indices(x, y, budget - extrema_budget)
+        if extrema_budget >= 4: indices = np.union1d(indices, minmax_indices(y, extrema_budget))
+    elif method == 'minmax': indices = minmax_indices(y, budget)
+    else: raise ValueError(f"지원하지 않는 다운샘플링 방식입니다: {method}")
+    indices = _with_extremes(indices, np.asarray(y, dtype=np.float64))
+    return x[indices], y[indices]
@@ -0,0 +1,179 @@
+"""Ikawa 로그 아카이브를 일괄 분석해 로스팅별 요약 지표를 Parquet 또는 CSV로 저장합니다.
+
+    python ikawa_batch.py /path/to/archive -o summary.parquet --workers 8
+
+출력에 이미 있는 content hash는 건너뛰므로 중단된 작업을 같은 명령으로 이어서 실행할 수 있습니다.
+Parquet 출력은 실행마다 part 파일을 추가하는 디렉터리(pandas.read_parquet으로 한 번에 읽기 가능)이고,
+CSV 출력은 한 파일에 행을 이어 붙입니다.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from log_loader import (
+    DEFAULT_PARSE_WORKERS, EXHAUST_TEMP_COL, MOISTURE_LOSS_COL, TIME_COL,
+    content_hash, parse_log_bytes, profile_name_from_file,
+)
+from ror import DEFAULT_ROR_METHOD, DEFAULT_ROR_WINDOW, ror_for_series
+
+SUMMARY_COLUMNS = [
+    'file', 'content_hash', 'profile', 'n_samples', 'total_time', 'peak_temp', 'end_temp',
+    'mean_ror', 'max_ror', 'moisture_loss', 'warnings', 'error',
+]
+
+_known_hashes = frozenset()
+
+
+# --- 로스팅별 지표 ---
+def _last_valid(series):
+    index = series.last_valid_index()
+    return float(series.loc[index]) if index is not None else np.nan
+
+
+def roast_metrics(df, ror_method=DEFAULT_ROR_METHOD, ror_window=DEFAULT_ROR_WINDOW):
+    """로스팅 구간 DataFrame 한 개의 요약 지표. ROR은 ror 엔진으로 평활화해서 계산합니다."""
+    temp = df[EXHAUST_TEMP_COL] if EXHAUST_TEMP_COL in df.columns else pd.Series(dtype='float64')
+    ror = pd.Series(dtype='float64')
+    if TIME_COL in df.columns and temp.notna().sum() > 1:
+        ror = pd.Series(ror_for_series([(df[TIME_COL].to_numpy(dtype='float64'), temp.to_numpy(dtype='float64'))], ror_method, ror_window)[0])
+    return {
+        'n_samples': len(df),
+        'total_time': float(df[TIME_COL].max()) if TIME_COL in df.columns and not df.empty else np.nan,
+        'peak_temp': float(temp.max()) if temp.notna().any() else np.nan,
+        'end_temp': _last_valid(temp),
+        'mean_ror': float(ror.mean()) if ror.notna().any() else np.nan,
+        'max_ror': float(ror.max()) if ror.notna().any() else np.nan,
+        'moisture_loss': _last_valid(df[MOISTURE_LOSS_COL]) if MOISTURE_LOSS_COL in df.columns else np.nan,
+    }
+
+
+def _init_worker(known_hashes):
+    global _known_hashes
+    _known_hashes = known_hashes
+
+
+def analyse_file(job):
+    """워커에서 실행됩니다. 이미 처리된 파일이면 None을 돌려줍니다."""
+    path, rel_path = job
+    row = dict.fromkeys(SUMMARY_COLUMNS, np.nan)
+    row.update(file=rel_path, content_hash='', profile=profile_name_from_file(os.path.basename(rel_path)), warnings='', error='')
+    try:
+        # 읽기 실패(삭제/권한/깨진 링크)는 content_hash를 비워 두므로 다음 실행에서 다시 시도됩니다.
+        with open(path, 'rb') as f: bytes_data = f.read()
+        key = content_hash(bytes_data)
+        if key in _known_hashes: return None
+        row['content_hash'] = key
+        df, warnings = parse_log_bytes(os.path.basename(rel_path), bytes_data)
+        row.update(roast_metrics(df)); row['warnings'] = ' | '.join(warnings)
+    except Exception as e:
+        row['error'] = str(e)
+    return row
+
+
+# --- 스트리밍 파이프라인 ---
+def iter_log_files(root):
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if file_name.lower().endswith('.csv'):
+                path = os.path.join(dir_path, file_name)
+                yield path, os.path.relpath(path, root)
+
+
+def _make_pool(max_workers, known_hashes, use_processes):
+    if use_processes:
+        try: return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(known_hashes,))
+        except (OSError, NotImplementedError, ImportError): pass
+    _init_worker(known_hashes)
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def analyse_files(jobs, known_hashes=frozenset(), max_workers=DEFAULT_PARSE_WORKERS, use_processes=True):
+    """(경로, 상대 경로) 이터레이터를 워커 풀에서 처리해 요약 행을 하나씩 내보냅니다.
+
+    동시에 제출하는 작업 수를 워커 수의 4배로 제한하므로 파일 수와 관계없이 메모리 사용량이 일정합니다.
+    결과 순서는 완료 순서입니다.
+    """
+    known_hashes = frozenset(known_hashes)
+    if max_workers <= 1:
+        _init_worker(known_hashes)
+        for job in jobs:
+            row = analyse_file(job)
+            if row is not None: yield row
+        return
+    jobs = iter(jobs); max_in_flight = max_workers * 4
+    with _make_pool(max_workers, known_hashes, use_processes) as pool:
+        in_flight = set()
+        while True:
+            for job in jobs:
+                in_flight.add(pool.submit(analyse_file, job))
+                if len(in_flight) >= max_in_flight: break
+            if not in_flight: return
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                row = future.result()
+                if row is not None: yield row
+
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size: yield batch; batch = []
+    if batch: yield batch
+
+
+# --- 출력 (CSV 이어 쓰기 / Parquet part 디렉터리) ---
+def _is_csv(output):
+    return output.lower().endswith('.csv')
+
+
+def read_known_hashes(output):
+    if not os.path.exists(output): return set()
+    if _is_csv(output): return set(pd.read_csv(output, usecols=['content_hash'])['content_hash'].dropna())
+    if os.path.isdir(output) and not any(f.endswith('.parquet') for f in os.listdir(output)): return set()
+    return set(pd.read_parquet(output, columns=['content_hash'])['content_hash'].dropna())
+
+
+def write_batches(batches, output):
+    written = 0
+    if _is_csv(output):
+        for batch in batches:
+            header = not os.path.exists(output) or os.path.getsize(output) == 0
+            pd.DataFrame(batch, columns=SUMMARY_COLUMNS).to_csv(output, mode='a', header=header, index=False)
+            written += len(batch)
+            yield written
+        return
+    os.makedirs(output, exist_ok=True)
+    run_id = time.strftime('%Y%m%d-%H%M%S')
+    for part, batch in enumerate(batches):
+        pd.DataFrame(batch, columns=SUMMARY_COLUMNS).to_parquet(os.path.join(output, f'part-{run_id}-{part:05d}.parquet'), index=False)
+        written += len(batch)
+        yield written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ikawa 로그 아카이브를 일괄 분석해 로스팅별 요약 지표를 저장합니다.")
+    parser.add_argument('archive', help="CSV 로그가 들어 있는 디렉터리 (하위 디렉터리 포함)")
+    parser.add_argument('-o', '--output', default='roast_summary.parquet', help="출력 경로 (.csv면 CSV, 그 외에는 Parquet 디렉터리)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_PARSE_WORKERS, help="워커 수 (1이면 순차 처리)")
+    parser.add_argument('--threads', action='store_true', help="프로세스 대신 스레드 풀 사용")
+    parser.add_argument('--batch-size', type=int, default=500, help="한 번에 기록할 행 수")
+    args = parser.parse_args(argv)
+
+    known_hashes = read_known_hashes(args.output)
+    if known_hashes: print(f"기존 출력에서 {len(known_hashes)}개 로그를 건너뜁니다.", file=sys.stderr)
+    start = time.perf_counter(); written = 0
+    rows = analyse_files(iter_log_files(args.archive), known_hashes, args.workers, not args.threads)
+    for written in write_batches(batched(rows, args.batch_size), args.output):
+        print(f"{written}개 기록 ({time.perf_counter() - start:.1f}초)", file=sys.stderr)
+    print(f"완료: 새 로그 {written}개 → {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""진행 중인 로스팅 로그를 따라가며 새로 추가된 행만 파싱합니다.
+
+소스 지정 방식:
+
+    /path/to/log.csv        계속 자라는 CSV 파일 (파일이 잘리거나 교체되면 처음부터 다시 읽음)
+    fifo:/path/to/pipe      이름 있는 파이프 (기기 대용, replay_log.py로 재생 가능)
+    tcp://127.0.0.1:9000    로컬 소켓 (replay_log.py가 서버로 대기)
+
+로스팅 구간 판정(state 전환)과 ROR은 새 행이 들어올 때마다 뒷부분만 다시 계산합니다.
+"""
+import os
+import re
+import socket
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from log_loader import EXHAUST_TEMP_COL, EXHAUST_ROR_COL, ROAST_END_PATTERN, ROAST_START_PATTERN, STATE_COL, TIME_COL
+from roast_store import CHANNELS, RoastLog
+from ror import DEFAULT_ROR_METHOD, DEFAULT_ROR_WINDOW, align, compute_ror, grid_step
+
+LIVE_PHASES = ['waiting', 'roasting', 'finished']
+READ_CHUNK_BYTES = 1 << 20  # 한 번의 poll에서 읽는 최대 바이트 (밀린 데이터는 다음 poll에서 이어 읽음)
+MIN_ROWS_FOR_STEP = 8  # ROR 격자 간격을 정하기 전에 모을 최소 행 수
+
+_START_RE = re.compile(ROAST_START_PATTERN)
+_END_RE = re.compile(ROAST_END_PATTERN)
+
+
+# --- 입력 소스 (read()는 (새 바이트, 처음부터 다시 읽는지 여부)를 돌려줍니다) ---
+class FileSource:
+    def __init__(self, path):
+        self.path = path; self.offset = 0; self.inode = None
+
+    def read(self, max_bytes=READ_CHUNK_BYTES):
+        try: stat = os.stat(self.path)
+        except FileNotFoundError: return b'', False
+        restarted = False
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            restarted = self.inode is not None
+            self.inode = stat.st_ino; self.offset = 0
+        if stat.st_size == self.offset: return b'', restarted
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset); data = f.read(max_bytes)
+        self.offset += len(data)
+        return data, restarted
+
+    def close(self):
+        pass
+
+
+class FifoSource:
+    def __init__(self, path):
+        self.path = path; self.fd = None
+
+    def read(self, max_bytes=READ_CHUNK_BYTES):
+        if self.fd is None:
+            try: self.fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+            except FileNotFoundError: return b'', False
+        try: return os.read(self.fd, max_bytes), False
+        except BlockingIOError: return b'', False
+
+    def close(self):
+        if self.fd is not None: os.close(self.fd); self.fd = None
+
+
+class SocketSource:
+    def __init__(self, host, port):
+        self.address = (host, port); self.sock = None
+
+    def read(self, max_bytes=READ_CHUNK_BYTES):
+        restarted = False
+        if self.sock is None:
+            try: self.sock = socket.create_connection(self.address, timeout=0.5)
+            except OSError: return b'', False
+            self.sock.setblocking(False); restarted = True
+        chunks = []; size = 0
+        while size < max_bytes:
+            try: chunk = self.sock.recv(min(65536, max_bytes - size))
+            except BlockingIOError: break
+            except OSError: chunk = b''
+            if not chunk:  # 상대가 연결을 닫았으면 다음 poll에서 다시 연결합니다.
+                self.close(); break
+            chunks.append(chunk); size += len(chunk)
+        return b''.join(chunks), restarted
+
+    def close(self):
+        if self.sock is not None: self.sock.close(); self.sock = None
+
+
+def open_source(spec):
+    """'fifo:경로', 'tcp://호스트:포트' 또는 파일 경로로부터 소스를 만듭니다."""
+    if spec.startswith('tcp://'):
+        parts = urlsplit(spec)
+        if not parts.port: raise ValueError(f"포트가 없는 소켓 주소입니다: {spec}")
+        return SocketSource(parts.hostname or '127.0.0.1', parts.port)
+    if spec.startswith('fifo:'): return FifoSource(spec[len('fifo:'):])
+    return FileSource(spec)
+
+
+# --- 증분 파서 ---
+class LiveTail:
+    """소스에서 새로 들어온 행만 파싱해 로스팅 구간 배열을 늘려 갑니다.
+
+    phase는 'waiting'(로스팅 시작 전) → 'roasting' → 'finished'(쿨링 시작)로 바뀌며,
+    parse_log_bytes와 같이 시작 state 이전 행과 쿨링 이후 행은 버리고 시간은 시작 시점 기준입니다.
+    ROR은 고정 간격 격자 위에서 계산하며, ror[:ror_final]은 이후 데이터가 들어와도 바뀌지 않는 확정 값입니다.
+    """
+
+    def __init__(self, source, ror_method=DEFAULT_ROR_METHOD, ror_window=DEFAULT_ROR_WINDOW, capacity=4096):
+        self.source = source; self.ror_method = ror_method; self.ror_window = ror_window
+        self._capacity = capacity
+        self.reset()
+
+    def reset(self):
+        self._pending = b''; self._columns = None; self._state_index = None
+        self.time = np.empty(self._capacity, dtype=np.float64)
+        self.values = np.full((len(CHANNELS), self._capacity), np.nan, dtype=np.float32)
+        self.n = 0; self.phase = 'waiting'; self.start_time = None
+        self.rows_read = 0; self.bad_rows = 0
+        self.step = None; self.ror = np.empty(0); self.ror_cells = 0; self.ror_final = 0
+
+    # 배열 뷰 (복사 없음)
+    def column(self, col):
+        return self.values[CHANNELS.index(col), :self.n]
+
+    @property
+    def times(self):
+        return self.time[:self.n]
+
+    @property
+    def ror_grid(self):
+        return np.arange(self.ror_cells) * self.step if self.step else np.empty(0)
+
+    def poll(self):
+        """소스에서 새 데이터를 읽어 처리합니다. 이번에 추가된 로스팅 행 수를 돌려줍니다.
+
+        소스가 처음부터 다시 시작되면(파일 교체/재연결) 상태를 초기화하므로 restarted 여부는 n 감소로 알 수 있습니다.
+        """
+        data, restarted = self.source.read()
+        if restarted: self.reset()
+        if not data: return 0
+        lines = (self._pending + data).split(b'\n')
+        self._pending = lines.pop()
+        previous_n = self.n
+        self._parse_lines(lines)
+        if self.n > previous_n: self._update_ror(previous_n)
+        if self.phase == 'finished': self.ror_final = self.ror_cells
+        return self.n - previous_n
+
+    def _read_header(self, line):
+        headers = [h.strip() for h in line.decode('utf-8-sig').strip().split(',')]
+        if headers[0] != TIME_COL: raise ValueError("첫 열이 'time'이 아닙니다.")
+        self._columns = [(i, headers.index(col)) for i, col in enumerate(CHANNELS) if col in headers]
+        self._state_index = headers.index(STATE_COL) if STATE_COL in headers else None
+        self._width = max([0, self._state_index or 0] + [j for _, j in self._columns]) + 1
+        if self._state_index is None: self.phase = 'roasting'
+
+    def _parse_lines(self, lines):
+        rows = []
+        for line in lines:
+            if not line.strip(): continue
+            if self._columns is None: self._read_header(line); continue
+            if self.phase == 'finished': break
+            self.rows_read += 1
+            fields = line.split(b',')
+            if len(fields) < self._width: self.bad_rows += 1; continue
+            if self._state_index is not None:
+                state = fields[self._state_index].strip().lower().decode('utf-8', 'replace')
+                if self.phase == 'waiting':
+                    if not _START_RE.search(state): continue
+                    self.phase = 'roasting'
+                elif _END_RE.search(state):
+                    self.phase = 'finished'; break
+            rows.append(fields)
+        if rows: self._append(rows)
+
+    def _append(self, rows):
+        count = len(rows)
+        if self.n + count > self.time.shape[0]:
+            capacity = max(self.time.shape[0] * 2, self.n + count)
+            time = np.empty(capacity, dtype=np.float64); time[:self.n] = self.time[:self.n]
+            values = np.full((len(CHANNELS), capacity), np.nan, dtype=np.float32); values[:, :self.n] = self.values[:, :self.n]
+            self.time, self.values = time, values
+        block = slice(self.n, self.n + count)
+        self.time[block] = [_to_float(fields[0]) for fields in rows]
+        for i, j in self._columns: self.values[i, block] = [_to_float(fields[j]) for fields in rows]
+        if self.start_time is None: self.start_time = self.time[self.n]
+        self.time[block] -= self.start_time
+        self.n += count
+
+    def _update_ror(self, previous_n):
+        temp_index = CHANNELS.index(EXHAUST_TEMP_COL)
+        valid = np.isfinite(self.time[:self.n]) & np.isfinite(self.values[temp_index, :self.n])
+        if self.step is None:
+            if valid.sum() < MIN_ROWS_FOR_STEP: return
+            self.step = grid_step([self.time[:self.n][valid]]); previous_n = 0
+        step = self.step
+        half = max(2 if self.ror_method == 'savgol' else 1, int(round(self.ror_window / 2 / step)))
+        t = self.time[:self.n][valid]; v = self.values[temp_index, :self.n][valid]
+        n_cells = int(np.floor(t.max() / step + 0.5)) + 1
+        if n_cells > len(self.ror):
+            ror = np.full(max(n_cells, len(self.ror) * 2), np.nan); ror[:len(self.ror)] = self.ror; self.ror = ror
+        # 새 행은 직전 마지막 시간 이후 격자만 바꾸고, ROR은 그 앞 (half + 1)칸까지만 영향을 받습니다.
+        previous_valid = valid[:previous_n]
+        last_old = self.time[:previous_n][previous_valid].max() if previous_valid.any() else 0.0
+        first_changed = max(0, int(np.floor(last_old / step)) - (half + 1))
+        first_cell = max(0, first_changed - (half + 1))
+        first_sample = max(0, np.searchsorted(t, first_cell * step, side='right') - 1)
+        _, matrix = align([(t[first_sample:] - first_cell * step, v[first_sample:])], step)
+        tail_ror = compute_ror(matrix, step, self.ror_method, self.ror_window)[0]
+        write = slice(first_changed, min(first_cell + len(tail_ror), len(self.ror)))
+        self.ror[write] = tail_ror[write.start - first_cell:write.stop - first_cell]
+        self.ror[write.stop:] = np.nan
+        self.ror_cells = n_cells
+        self.ror_final = max(0, int(np.floor(t.max() / step)) - (half + 1))
+
+    def ror_series(self):
+        """계산된 ROR의 (격자 시간, 값). 끝부분은 새 데이터가 오면 바뀔 수 있습니다."""
+        return self.ror_grid[:self.ror_cells], self.ror[:self.ror_cells]
+
+    def to_roast_log(self, computed_ror=False):
+        """현재까지의 로스팅 구간을 RoastLog로 복사합니다. computed_ror이면 ROR 채널을 계산 ROR로 바꿉니다."""
+        values = self.values[:, :self.n].copy()
+        if computed_ror and self.step:
+            grid, ror = self.ror_series(); finite = np.isfinite(ror)
+            values[CHANNELS.index(EXHAUST_ROR_COL)] = np.interp(self.times, grid[finite], ror[finite], left=np.nan, right=np.nan) if finite.sum() > 1 else np.nan
+        return RoastLog(self.times, values)
+
+    def close(self):
+        self.source.close()
+
+
+def _to_float(field):
+    try: return float(field)
+    except ValueError: return np.nan
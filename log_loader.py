@@ -0,0 +1,315 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+# --- 핵심 데이터 열 이름 ---
+TIME_COL = 'time'; EXHAUST_TEMP_COL = 'temp above'; INLET_TEMP_COL = 'temp below'
+EXHAUST_ROR_COL = 'ror_above'; STATE_COL = 'state'; FAN_SPEED_COL = 'fan speed'
+HUMIDITY_COL = 'abs_humidity'; HUMIDITY_ROC_COL = 'abs_humidity_roc'
+NUMERIC_COLS = [EXHAUST_TEMP_COL, INLET_TEMP_COL, EXHAUST_ROR_COL, FAN_SPEED_COL, HUMIDITY_COL, HUMIDITY_ROC_COL]
+OPTIONAL_COLS = [HUMIDITY_COL, HUMIDITY_ROC_COL]
+MOISTURE_LOSS_COL = 'total_moisture_loss'
+
+# --- 예상되는 전체 헤더 목록 ---
+EXPECTED_HEADERS = [
+    'time', 'fan set', 'setpoint', 'fan speed', 'temp above', 'state',
+    'heater', 'p', 'i', 'd', 'temp below', 'temp board', 'j', 'ror_above',
+    'abs_humidity', 'abs_humidity_roc', 'abs_humidity_roc_direction',
+    'adfc_timestamp', 'end_timestamp', 'tdf_error', 'pressure',
+    'total_moisture_loss', 'moisture_loss_rate'
+]
+# --- 분석기가 실제로 사용하는 열과 선언 dtype (센서 값은 float32, state는 category) ---
+LOG_DTYPES = {TIME_COL: 'float64', STATE_COL: 'category'}
+LOG_DTYPES.update({col: 'float32' for col in NUMERIC_COLS})
+LOG_DTYPES[MOISTURE_LOSS_COL] = 'float32'
+# --- 로스팅 구간을 나누는 state 값 (정규화된 소문자 기준 정규식) ---
+ROAST_START_PATTERN = 'roasting|ready_for_roast'
+ROAST_END_PATTERN = 'cooling|cooldown'
+
+# --- 디스크 캐시 설정 (환경 변수로 변경 가능) ---
+DEFAULT_CACHE_DIR = os.environ.get('IKAWA_LOG_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'ikawa-log-analyzer'))
+DEFAULT_CACHE_MAX_BYTES = int(float(os.environ.get('IKAWA_LOG_CACHE_MAX_MB', '512')) * 1024 * 1024)
+STALE_TMP_SECONDS = 600  # 이보다 오래된 .tmp는 중단된 저장이 남긴 것으로 보고 지웁니다 (진행 중인 다른 세션의 저장은 건드리지 않음).
+# parse_log_bytes의 출력(열/dtype/구간 판정)이 바뀌면 올려서 이전 캐시 항목을 무효화합니다.
+PARSER_VERSION = 3
+# --- 병렬 파싱 워커 수 (1 이하이면 순차 처리) ---
+DEFAULT_PARSE_WORKERS = int(os.environ.get('IKAWA_PARSE_WORKERS', str(os.cpu_count() or 1)))
+
+
+def content_hash(bytes_data):
+    return hashlib.sha256(bytes_data).hexdigest()
+
+
+def profile_name_from_file(file_name):
+    return file_name.replace('.csv', '')
+
+
+# --- 타입 지정 CSV 리더 ---
+def _read_header(decoded_head):
+    return [h.strip() for h in decoded_head.split('\n', 1)[0].strip().split(',')]
+
+
+def _read_typed_pyarrow(bytes_data, headers, use_cols):
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    column_types = {col: pa.dictionary(pa.int32(), pa.string()) if LOG_DTYPES[col] == 'category' else pa.from_numpy_dtype(np.dtype(LOG_DTYPES[col])) for col in use_cols}
+    table = pa_csv.read_csv(
+        io.BytesIO(bytes_data),
+        read_options=pa_csv.ReadOptions(column_names=headers, skip_rows=1),
+        convert_options=pa_csv.ConvertOptions(include_columns=use_cols, column_types=column_types, null_values=['', ' ', 'nan', ' nan', 'NaN', ' NaN'], strings_can_be_null=True),
+    )
+    return table.to_pandas()
+
+
+def _read_generic(decoded_data, headers, use_cols):
+    # pyarrow가 없거나 파일에 잘못된 행/값이 있을 때 사용하는 기존 방식
+    df = pd.read_csv(io.StringIO(decoded_data), header=None, skiprows=1, skipinitialspace=True, on_bad_lines='warn')
+    if len(headers) >= len(df.columns): df.columns = headers[:len(df.columns)]
+    else: df.columns = headers + [f'unknown_{i}' for i in range(len(df.columns) - len(headers))]
+    df = df.loc[:, ~df.columns.duplicated()][[col for col in use_cols if col in df.columns]]
+    for col in df.columns:
+        if LOG_DTYPES[col] == 'category': df[col] = df[col].astype('category')
+        else: df[col] = pd.to_numeric(df[col], errors='coerce').astype(LOG_DTYPES[col])
+    return df
+
+
+def _normalise_state(state):
+    # 카테고리 이름만 정리하므로 행 수와 무관하게 문자열 연산은 카테고리 수만큼만 수행됩니다.
+    state = state.astype('category')
+    labels = np.append(state.cat.categories.astype(str).str.strip().str.lower().to_numpy(dtype=object), 'nan')
+    categories, inverse = np.unique(labels, return_inverse=True)
+    return pd.Series(pd.Categorical.from_codes(inverse[state.cat.codes.to_numpy()], categories), index=state.index, name=state.name)
+
+
+def read_log_csv(bytes_data):
+    """Ikawa CSV에서 분석에 쓰는 열만 LOG_DTYPES로 읽습니다. pyarrow가 있으면 pyarrow CSV 엔진을 사용합니다."""
+    try: decoded_data = bytes_data.decode('utf-8-sig')
+    except UnicodeDecodeError: decoded_data = bytes_data.decode('utf-8')
+    headers = _read_header(decoded_data[:4096])
+    if headers[0] != 'time': raise ValueError("첫 열이 'time'이 아닙니다.")
+    use_cols = [col for col in LOG_DTYPES if col in headers]
+    df = None
+    if len(set(headers)) == len(headers):
+        try: df = _read_typed_pyarrow(bytes_data, headers, use_cols)
+        except (ImportError, ValueError, KeyError): df = None
+    if df is None: df = _read_generic(decoded_data, headers, use_cols)
+    if STATE_COL in df.columns: df[STATE_COL] = _normalise_state(df[STATE_COL])
+    return df
+
+
+# --- CSV 파싱 및 로스팅 구간 추출 ---
+def parse_log_bytes(file_name, bytes_data):
+    """CSV 바이트를 로스팅 구간 DataFrame으로 변환합니다. (df, 경고 메시지 목록)을 반환합니다."""
+    warnings = []
+    df = read_log_csv(bytes_data)
+    roasting_df = pd.DataFrame()
+    if STATE_COL in df.columns:
+        start_mask = df[STATE_COL].str.contains(ROAST_START_PATTERN, case=False, na=False)
+        end_mask = df[STATE_COL].str.contains(ROAST_END_PATTERN, case=False, na=False)
+        start_index = -1
+        if start_mask.any(): start_index = df[start_mask].index[0]
+        end_index = len(df)
+        if end_mask.any(): end_index = df[end_mask].index[0]
+        if start_index != -1: roasting_df = df.iloc[start_index:end_index].copy()
+        else:
+            warnings.append(f"'{file_name}': 로스팅 시작 상태를 찾을 수 없어 전체 데이터를 사용합니다 (쿨링 제외 시도).")
+            roasting_df = df[~end_mask].copy()
+    else:
+        warnings.append(f"'{file_name}': 'state' 열이 없어 전체 데이터를 사용합니다.")
+        roasting_df = df.copy()
+    if TIME_COL in roasting_df.columns and not roasting_df.empty:
+        start_time = roasting_df[TIME_COL].iloc[0]
+        roasting_df[TIME_COL] = roasting_df[TIME_COL] - start_time
+    for col in NUMERIC_COLS:
+        if col not in roasting_df.columns:
+            if col not in OPTIONAL_COLS:
+                warnings.append(f"'{file_name}': 필수 열 '{col}'이 없습니다.")
+            roasting_df[col] = pd.Series(np.nan, index=roasting_df.index, dtype=LOG_DTYPES[col])
+    return roasting_df, warnings
+
+
+# --- 병렬 파싱 ---
+def _parse_job(job):
+    # 워커 프로세스에서 실행되므로 Streamlit 호출 없이 결과만 돌려줍니다.
+    file_name, bytes_data = job
+    try:
+        df, warnings = parse_log_bytes(file_name, bytes_data)
+        return df, warnings, None
+    except Exception as e:
+        return None, [], f"'{file_name}' 파일을 처리하는 중 오류 발생: {e}"
+
+
+def make_parse_pool(max_workers=DEFAULT_PARSE_WORKERS):
+    """파싱용 프로세스 풀. 스레드가 많은 Streamlit 서버에서 fork하지 않도록 forkserver(없으면 spawn)로 워커를 띄웁니다.
+
+    앱에서는 하나를 만들어 세션 간에 공유하므로 동시 업로드가 많아도 워커 수는 max_workers로 제한됩니다.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    return ProcessPoolExecutor(max_workers=max(1, max_workers), mp_context=context)
+
+
+def parse_logs_parallel(files, max_workers=DEFAULT_PARSE_WORKERS, use_processes=True, pool=None, on_pool_error=None):
+    """(파일 이름, 바이트) 목록을 워커 풀에서 파싱합니다.
+
+    입력 순서대로 (df 또는 None, 경고 목록, 오류 메시지 또는 None)를 반환합니다.
+    max_workers가 1 이하이면 pool과 관계없이 순차 처리합니다.
+    pool이 주어지면 그 풀을 사용하고(종료하지 않음), 아니면 이번 호출용 풀을 만듭니다.
+    주어진 pool이 깨졌거나 종료됐으면 on_pool_error(예외)를 부른 뒤 이번 호출용 풀로 다시 파싱합니다.
+    프로세스 풀을 만들거나 쓸 수 없는 환경에서는 스레드 풀로 대체합니다.
+    """
+    files = list(files)
+    if not files: return []
+    max_workers = max(1, min(max_workers or 1, len(files)))
+    if max_workers == 1: return [_parse_job(job) for job in files]
+    chunksize = max(1, len(files) // (max_workers * 4))
+    if pool is not None:
+        try: return list(pool.map(_parse_job, files, chunksize=chunksize))
+        except (OSError, BrokenProcessPool, RuntimeError) as error:
+            if on_pool_error is not None: on_pool_error(error)
+    if use_processes:
+        try:
+            with make_parse_pool(max_workers) as own_pool:
+                return list(own_pool.map(_parse_job, files, chunksize=chunksize))
+        except (OSError, NotImplementedError, RuntimeError, ImportError, BrokenProcessPool):
+            pass
+    with ThreadPoolExecutor(max_workers=max_workers) as thread_pool:
+        return list(thread_pool.map(_parse_job, files))
+
+
+# --- 디스크 캐시 (크기 제한 LRU) ---
+class LogCache:
+    """content hash를 키로 파싱된 로그와 파싱 경고를 디스크에 저장합니다. pyarrow가 있으면 Parquet, 없으면 pickle을 사용합니다.
+
+    파일 이름에 PARSER_VERSION이 들어가므로 파서가 바뀌면 이전 항목은 조회되지 않고 처음 디렉터리를 훑을 때 지워집니다.
+    항목별 크기와 사용 시각은 처음 한 번만 디렉터리를 훑어 메모리에 유지합니다.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        try:
+            import pyarrow  # noqa: F401
+            self.ext = '.parquet'
+        except ImportError:
+            self.ext = '.pkl'
+        self._entries = None  # 경로 -> [마지막 사용 시각, 크기]
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.v{PARSER_VERSION}{self.ext}')
+
+    def _scan(self):
+        # 호출 전에 _lock을 잡아야 합니다. 항목마다 stat은 한 번만 합니다.
+        if self._entries is not None: return
+        self._entries = {}
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(self.ext + '.tmp'):
+                        try: stale = entry.stat().st_mtime < time.time() - STALE_TMP_SECONDS
+                        except OSError: continue
+                        if stale: self._remove(entry.path)
+                        continue
+                    if not entry.name.endswith(self.ext): continue
+                    if not entry.name.endswith(f'.v{PARSER_VERSION}{self.ext}'):
+                        self._remove(entry.path); continue  # 이전 파서 버전의 항목
+                    try: stat = entry.stat()
+                    except OSError: continue
+                    self._entries[entry.path] = [stat.st_mtime, stat.st_size]
+        except OSError:
+            pass
+        self._total = sum(size for _, size in self._entries.values())
+
+    def get(self, key):
+        """(DataFrame, 파싱 시점의 파일 이름, 경고 목록) 또는 None."""
+        path = self._path(key)
+        if not os.path.exists(path): return None
+        try:
+            df = pd.read_parquet(path) if self.ext == '.parquet' else pd.read_pickle(path)
+        except Exception:
+            self._remove(path); return None
+        try: os.utime(path)  # LRU 순서 갱신
+        except OSError: pass
+        with self._lock:
+            if self._entries is not None and path in self._entries: self._entries[path][0] = time.time()
+        file_name = df.attrs.pop('parse_file_name', ''); warnings = list(df.attrs.pop('parse_warnings', []))
+        return df, file_name, warnings
+
+    def put(self, key, df, file_name='', warnings=()):
+        path = self._path(key); tmp_path = path + '.tmp'
+        df = df.copy(deep=False)
+        df.attrs = {'parse_file_name': file_name, 'parse_warnings': list(warnings)}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if self.ext == '.parquet': df.to_parquet(tmp_path, index=False)
+            else: df.reset_index(drop=True).to_pickle(tmp_path)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            # 캐시 저장 실패는 분석에 영향을 주지 않으므로 무시합니다.
+            self._remove(tmp_path); return
+        with self._lock:
+            self._scan()
+            previous = self._entries.get(path)
+            if previous is not None: self._total -= previous[1]
+            self._entries[path] = [time.time(), size]; self._total += size
+
+    def evict(self):
+        """전체 크기가 max_bytes를 넘으면 오래 쓰지 않은 항목부터 지웁니다. 저장을 한 묶음 마친 뒤 호출합니다."""
+        with self._lock:
+            self._scan()
+            if self._total <= self.max_bytes: return
+            for path, (_, size) in sorted(self._entries.items(), key=lambda item: item[1][0]):
+                if self._total <= self.max_bytes: break
+                self._remove(path); del self._entries[path]; self._total -= size
+
+    def _remove(self, path):
+        try: os.remove(path)
+        except OSError: pass
+
+
+# --- 증분 로딩 ---
+def ingest_logs(files, previous_logs=None, previous_hashes=None, cache=None, max_workers=DEFAULT_PARSE_WORKERS, transform=None, pool=None, on_pool_error=None):
+    """(파일 이름, 바이트) 목록을 받아 새로 추가되거나 변경된 파일만 파싱합니다.
+
+    (logs, hashes, warnings, errors)를 반환합니다. 업로드 목록에서 빠진 로그는 결과에 포함되지 않습니다.
+    캐시에 없는 파일은 parse_logs_parallel로 한 번에 파싱합니다 (pool이 주어지면 공유 풀 사용, 풀 오류는 on_pool_error로 알림).
+    transform이 주어지면 새로 읽은 DataFrame을 디스크 캐시에 저장한 뒤 변환해서 돌려줍니다 (예: RoastLog.from_frame).
+    캐시에서 읽은 로그도 처음 파싱할 때의 경고를 함께 돌려줍니다.
+    """
+    transform = transform or (lambda df: df)
+    previous_logs = previous_logs or {}; previous_hashes = previous_hashes or {}
+    known = {h: previous_logs[name] for name, h in previous_hashes.items() if name in previous_logs}
+    keys = []; pending = {}; warnings = []; errors = []
+    for file_name, bytes_data in files:
+        key = content_hash(bytes_data); keys.append((file_name, key))
+        if key in known or key in pending: continue
+        cached = cache.get(key) if cache is not None else None
+        if cached is None: pending[key] = (file_name, bytes_data); continue
+        df, cached_name, cached_warnings = cached
+        # 캐시된 경고도 매번 다시 보여 줍니다 (파일 이름만 지금 업로드한 이름으로 바꿈).
+        cached_warnings = [w.replace(f"'{cached_name}'", f"'{file_name}'") for w in cached_warnings] if cached_name else cached_warnings
+        known[key] = transform(df); warnings.extend(cached_warnings)
+    results = parse_logs_parallel(pending.values(), max_workers=max_workers, pool=pool, on_pool_error=on_pool_error)
+    for key, (df, file_warnings, error) in zip(pending.keys(), results):
+        warnings.extend(file_warnings)
+        if error is not None: errors.append(error); continue
+        if cache is not None: cache.put(key, df, pending[key][0], file_warnings)
+        known[key] = transform(df)
+    if cache is not None and pending: cache.evict()
+    logs = {}; hashes = {}
+    for file_name, key in keys:
+        if key not in known: continue
+        profile_name = profile_name_from_file(file_name)
+        logs[profile_name] = known[key]; hashes[profile_name] = key
+    return logs, hashes, warnings, errors
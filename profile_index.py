@@ -0,0 +1,273 @@
+"""로스팅 프로파일 유사도 검색용 인덱스.
+
+각 로그의 온도/ROR/팬 속도를 고정 시간 격자로 리샘플링해 하나의 float32 행렬 파일(memmap)에 쌓고,
+로그 이름과 content hash는 JSON 사이드카에 저장합니다.
+
+    python profile_index.py build /path/to/archive            # 아카이브를 인덱스에 추가
+    python profile_index.py query /path/to/log.csv -k 10      # 가장 비슷한 로스팅 검색
+"""
+import argparse
+import contextlib
+import copy
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 스레드 잠금만 사용
+    fcntl = None
+
+from log_loader import (
+    DEFAULT_CACHE_DIR, DEFAULT_PARSE_WORKERS, EXHAUST_TEMP_COL, EXHAUST_ROR_COL, FAN_SPEED_COL,
+    content_hash, parse_logs_parallel, profile_name_from_file,
+)
+from roast_store import RoastLog
+
+PROFILE_CHANNELS = [EXHAUST_TEMP_COL, EXHAUST_ROR_COL, FAN_SPEED_COL]
+DEFAULT_GRID_SECONDS = 900
+DEFAULT_GRID_STEP = 2.0
+DEFAULT_INDEX_DIR = os.environ.get('IKAWA_PROFILE_INDEX_DIR', os.path.join(DEFAULT_CACHE_DIR, 'profile-index'))
+INDEX_METRICS = ['l2', 'dtw']
+MATRIX_FILE = 'profiles.f32'
+SIDECAR_FILE = 'profiles.json'
+LOCK_FILE = 'profiles.lock'
+
+
+def resample_log(log, grid, channels=PROFILE_CHANNELS):
+    """RoastLog를 (채널 수, 격자 수) float32 배열로 리샘플링합니다.
+
+    로그 끝 이후는 마지막 값을 유지해 길이가 다른 로스팅도 비교할 수 있게 하고, 채널이 없으면 NaN입니다.
+    """
+    profile = np.full((len(channels), len(grid)), np.nan, dtype=np.float32)
+    for row, col in zip(profile, channels):
+        t, v = log.lookup_series(col)
+        if len(t) > 1: row[:] = np.interp(grid, t, v)
+    return profile
+
+
+class ProfileIndex:
+    """앱(세션 간 공유)과 명령줄 도구가 같은 디렉터리를 함께 쓸 수 있습니다.
+
+    쓰기는 lock 파일의 flock으로 프로세스 간 직렬화하고, 잠근 뒤 사이드카를 다시 읽어 다른 프로세스가 추가한 행 뒤에 이어 씁니다.
+    읽기 쪽은 사이드카가 바뀌면 메타와 memmap을 다시 엽니다.
+    """
+
+    def __init__(self, index_dir=DEFAULT_INDEX_DIR, grid_seconds=DEFAULT_GRID_SECONDS, grid_step=DEFAULT_GRID_STEP):
+        self.index_dir = index_dir
+        self.meta = {
+            'version': 1, 'channels': PROFILE_CHANNELS, 'grid_seconds': grid_seconds, 'grid_step': grid_step,
+            'stats': {'count': [0.0] * len(PROFILE_CHANNELS), 'sum': [0.0] * len(PROFILE_CHANNELS), 'sumsq': [0.0] * len(PROFILE_CHANNELS)},
+            'entries': [],
+        }
+        self._hashes = set(); self._matrix = None; self._sidecar_stamp = None
+        # 같은 프로세스의 세션(스레드) 사이 잠금. 파일 잠금 안에서 _refresh를 다시 부르므로 재진입 가능해야 합니다.
+        self._lock = threading.RLock()
+        self._refresh()
+        self.channels = self.meta['channels']
+        self.grid = np.arange(0.0, self.meta['grid_seconds'] + self.meta['grid_step'] / 2, self.meta['grid_step'])
+        self.row_width = len(self.channels) * len(self.grid)
+
+    def _refresh(self):
+        """사이드카가 마지막으로 읽은 뒤 바뀌었으면 다시 읽습니다."""
+        path = os.path.join(self.index_dir, SIDECAR_FILE)
+        with self._lock:
+            try: stat = os.stat(path)
+            except FileNotFoundError: return
+            stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            if stamp == self._sidecar_stamp: return
+            with open(path, encoding='utf-8') as f: meta = json.load(f)
+            if len(meta['entries']) != len(self.meta['entries']): self._matrix = None
+            self.meta = meta; self._hashes = {entry['content_hash'] for entry in meta['entries']}
+            self._sidecar_stamp = stamp
+
+    @contextlib.contextmanager
+    def _write_lock(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        with self._lock, open(os.path.join(self.index_dir, LOCK_FILE), 'a') as lock_file:
+            if fcntl is not None: fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try: yield
+            finally:
+                if fcntl is not None: fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __len__(self):
+        self._refresh()
+        return len(self.meta['entries'])
+
+    def __contains__(self, key):
+        self._refresh()
+        return key in self._hashes
+
+    @property
+    def entries(self):
+        return self.meta['entries']
+
+    @property
+    def matrix(self):
+        """(로그 수, 채널 수 × 격자 수) 모양의 읽기 전용 memmap."""
+        with self._lock:
+            self._refresh()
+            if self._matrix is None:
+                path = os.path.join(self.index_dir, MATRIX_FILE)
+                if not self.meta['entries'] or not os.path.exists(path): return np.empty((0, self.row_width), dtype=np.float32)
+                self._matrix = np.memmap(path, dtype=np.float32, mode='r', shape=(len(self.meta['entries']), self.row_width))
+            return self._matrix
+
+    def channel_scales(self):
+        with self._lock: count, total, sumsq = (np.array(self.meta['stats'][key]) for key in ('count', 'sum', 'sumsq'))
+        count = np.maximum(count, 1.0)
+        mean = total / count
+        std = np.sqrt(np.maximum(sumsq / count - mean ** 2, 0.0))
+        return np.where(std > 0, std, 1.0)
+
+    def profile(self, log):
+        return resample_log(log, self.grid, self.channels)
+
+    def add(self, items):
+        """(이름, content hash, RoastLog) 목록을 인덱스 끝에 추가합니다. 이미 있는 hash는 건너뜁니다."""
+        profiles = {}
+        for name, key, log in items:
+            if key not in self and key not in profiles: profiles[key] = (name, log, self.profile(log))
+        if not profiles: return 0
+        with self._write_lock():
+            # 다른 프로세스가 그 사이에 추가한 행을 반영한 뒤 이어 씁니다.
+            self._refresh()
+            profiles = {key: value for key, value in profiles.items() if key not in self._hashes}
+            if not profiles: return 0
+            meta = copy.deepcopy(self.meta); stats = meta['stats']; rows = []
+            for key, (name, log, profile) in profiles.items():
+                finite = np.isfinite(profile)
+                for i in range(len(self.channels)):
+                    values = profile[i][finite[i]].astype(np.float64)
+                    stats['count'][i] += len(values); stats['sum'][i] += float(values.sum()); stats['sumsq'][i] += float((values ** 2).sum())
+                rows.append(profile.reshape(-1))
+                meta['entries'].append({'name': name, 'content_hash': key, 'total_time': float(log.max_time) if np.isfinite(log.max_time) else None})
+            # 이전 실행이 행만 쓰고 사이드카를 못 바꾼 채 중단됐으면 남은 행을 잘라 내 행 위치를 사이드카와 맞춥니다.
+            matrix_path = os.path.join(self.index_dir, MATRIX_FILE)
+            with open(matrix_path, 'r+b' if os.path.exists(matrix_path) else 'wb') as f:
+                f.truncate(len(self.meta['entries']) * self.row_width * 4); f.seek(0, os.SEEK_END)
+                np.asarray(rows, dtype=np.float32).tofile(f)
+            tmp_path = os.path.join(self.index_dir, SIDECAR_FILE + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_path, os.path.join(self.index_dir, SIDECAR_FILE))
+            self._refresh()
+        return len(rows)
+
+    def row_profile(self, row):
+        return np.asarray(self.matrix[row]).reshape(len(self.channels), len(self.grid))
+
+    def to_roast_log(self, row):
+        """인덱스의 리샘플링된 프로파일을 그래프에 올릴 수 있는 RoastLog로 변환합니다 (원래 로스팅 시간까지만)."""
+        total_time = self.entries[row].get('total_time')
+        n = len(self.grid) if total_time is None else int(np.searchsorted(self.grid, total_time, side='right'))
+        return RoastLog(self.grid[:n], self.row_profile(row)[:, :n], self.channels)
+
+    # --- 검색 ---
+    def _l2(self, matrix, query, weights, chunk_size=4096):
+        distances = np.empty(len(matrix), dtype=np.float64)
+        q = (query * weights).reshape(1, -1)
+        w = np.repeat(weights.reshape(-1), len(self.grid)).reshape(1, -1)
+        for start in range(0, len(matrix), chunk_size):
+            block = np.asarray(matrix[start:start + chunk_size], dtype=np.float32) * w - q
+            valid = np.isfinite(block)
+            distances[start:start + len(block)] = np.sqrt(np.where(valid, block * block, 0.0).sum(axis=1) / np.maximum(valid.sum(axis=1), 1))
+        return distances
+
+    def _dtw(self, matrix, query, rows, weights, band):
+        # Sakoe–Chiba 밴드 안에서만 정렬을 허용하는 DTW. 후보 전체를 한 번에 계산합니다.
+        n_grid = len(self.grid); width = 2 * band + 1; blocked = 1e30
+        candidates = np.asarray(matrix[rows], dtype=np.float32).reshape(len(rows), len(self.channels), n_grid).astype(np.float64) * weights  # (후보, 채널, 격자)
+        q = query.astype(np.float64) * weights
+        padded = np.pad(candidates, ((0, 0), (0, 0), (band, band)), constant_values=np.nan)
+        offsets = np.arange(width)
+        start = np.where(offsets == band, 0.0, blocked)[None, :].repeat(len(rows), 0)
+        acc = None
+        for i in range(n_grid):
+            # 밴드 좌표: offset o는 j = i - band + o 에 해당합니다.
+            diff = padded[:, :, i + offsets] - q[None, :, i, None]
+            cost = np.where(np.isfinite(diff), diff * diff, 0.0).sum(axis=1)
+            outside = (i - band + offsets < 0) | (i - band + offsets >= n_grid)
+            cost[:, outside] = 0.0  # 누적합 정밀도를 위해 0으로 두고, 아래에서 결과를 막습니다.
+            # (i-1, j)는 이전 행의 offset+1, (i-1, j-1)은 이전 행의 같은 offset입니다.
+            best_prev = start if acc is None else np.minimum(acc, np.concatenate([acc[:, 1:], np.full((len(rows), 1), blocked)], axis=1))
+            # 같은 행의 (i, j-1) 의존성은 누적합 + 누적 최솟값으로 한 번에 풉니다:
+            # acc[o] = cost[o] + min(best_prev[o], acc[o-1]) = C[o] + min_{s<=o}(best_prev[s] - C[s-1])
+            cumulative = np.cumsum(cost, axis=1)
+            acc = np.minimum(cumulative + np.minimum.accumulate(best_prev - (cumulative - cost), axis=1), blocked)
+            acc[:, outside] = blocked
+        return np.sqrt(acc[:, band] / n_grid)
+
+    def query(self, profile, k=10, metric='l2', band=10, exclude=()):
+        """profile과 가장 가까운 k개를 (행 번호, 거리) 목록으로 돌려줍니다.
+
+        'dtw'는 먼저 L2로 후보를 추린 뒤(k의 10배) 밴드 제약 DTW로 다시 정렬합니다.
+        """
+        matrix = self.matrix  # 검색 도중 add가 일어나도 이 시점의 행만 봅니다.
+        if not len(matrix): return []
+        weights = (1.0 / self.channel_scales()).reshape(-1, 1).astype(np.float32)
+        profile = np.asarray(profile, dtype=np.float32)
+        distances = self._l2(matrix, profile, weights)
+        exclude = set(exclude)
+        excluded = [i for i, entry in enumerate(self.entries[:len(matrix)]) if entry['content_hash'] in exclude]
+        distances[excluded] = np.inf
+        n_candidates = min(len(matrix), k * 10 if metric == 'dtw' else k)
+        candidates = np.argpartition(distances, n_candidates - 1)[:n_candidates]
+        candidates = candidates[np.isfinite(distances[candidates])]
+        if metric == 'dtw' and len(candidates):
+            distances = dict(zip(candidates, self._dtw(matrix, profile, candidates, weights, band)))
+        elif metric != 'l2':
+            raise ValueError(f"지원하지 않는 거리 방식입니다: {metric}")
+        ranked = sorted(candidates, key=lambda r: distances[r])[:k]
+        return [(int(r), float(distances[r])) for r in ranked]
+
+
+# --- 명령줄 도구 ---
+def _iter_archive(root):
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if file_name.lower().endswith('.csv'): yield os.path.join(dir_path, file_name)
+
+
+def build_from_archive(index, root, max_workers=DEFAULT_PARSE_WORKERS, chunk_size=256):
+    paths = list(_iter_archive(root)); added = 0
+    for start in range(0, len(paths), chunk_size):
+        files = []
+        for path in paths[start:start + chunk_size]:
+            with open(path, 'rb') as f: bytes_data = f.read()
+            if content_hash(bytes_data) not in index: files.append((os.path.basename(path), bytes_data))
+        results = parse_logs_parallel(files, max_workers=max_workers)
+        items = [(profile_name_from_file(name), content_hash(data), RoastLog.from_frame(df)) for (name, data), (df, _, error) in zip(files, results) if error is None]
+        added += index.add(items)
+        print(f"{min(start + chunk_size, len(paths))}/{len(paths)} 파일 확인, {added}개 추가", file=sys.stderr)
+    return added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로스팅 프로파일 유사도 인덱스를 만들거나 검색합니다.")
+    parser.add_argument('--index-dir', default=DEFAULT_INDEX_DIR)
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="아카이브의 로그를 인덱스에 추가")
+    build.add_argument('archive'); build.add_argument('--workers', type=int, default=DEFAULT_PARSE_WORKERS)
+    query = sub.add_parser('query', help="CSV 로그와 가장 비슷한 로스팅 검색")
+    query.add_argument('log'); query.add_argument('-k', type=int, default=10)
+    query.add_argument('--metric', choices=INDEX_METRICS, default='l2'); query.add_argument('--band', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    index = ProfileIndex(args.index_dir)
+    if args.command == 'build':
+        build_from_archive(index, args.archive, args.workers)
+        print(f"인덱스 로그 수: {len(index)}", file=sys.stderr)
+        return
+    with open(args.log, 'rb') as f: bytes_data = f.read()
+    (df, _, error), = parse_logs_parallel([(os.path.basename(args.log), bytes_data)], max_workers=1)
+    if error: sys.exit(error)
+    for row, distance in index.query(index.profile(RoastLog.from_frame(df)), args.k, args.metric, args.band, exclude=[content_hash(bytes_data)]):
+        print(f"{distance:10.4f}  {index.entries[row]['name']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""기존 Ikawa 로그를 N배속으로 다시 흘려보내 라이브 모드를 오프라인에서 시험합니다.
+
+    python replay_log.py LOG.csv /tmp/live.csv --speed 10          # 파일에 이어 쓰기
+    python replay_log.py LOG.csv fifo:/tmp/ikawa.pipe --speed 10   # 이름 있는 파이프 (없으면 생성)
+    python replay_log.py LOG.csv tcp://127.0.0.1:9000 --speed 10   # 소켓 서버로 대기 후 전송
+    python replay_log.py LOG.csv /tmp/live.csv --speed 50 --bench  # LiveTail로 tick당 처리 지연 측정
+
+출력 주소는 앱의 라이브 모드 소스 입력과 같은 형식입니다.
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from live_tail import LiveTail, open_source
+from ror import DEFAULT_ROR_METHOD, DEFAULT_ROR_WINDOW, ROR_METHODS
+
+
+def split_log(bytes_data):
+    """(헤더 줄, [(원래 시간, 데이터 줄)]). 시간을 읽을 수 없는 줄은 앞 줄과 같은 시점에 보냅니다."""
+    lines = bytes_data.splitlines(keepends=True)
+    header, rows = lines[0], []
+    last_time = 0.0
+    for line in lines[1:]:
+        if not line.strip(): continue
+        try: last_time = float(line.split(b',', 1)[0])
+        except ValueError: pass
+        rows.append((last_time, line if line.endswith(b'\n') else line + b'\n'))
+    return header if header.endswith(b'\n') else header + b'\n', rows
+
+
+def iter_ticks(rows, speed, tick_seconds):
+    """tick마다 그때까지 보낼 줄들을 묶어서 내보냅니다 (벽시계 기준으로 속도를 맞춤)."""
+    if not rows: return
+    t0 = rows[0][0]; start = time.perf_counter(); i = 0
+    while i < len(rows):
+        due = (time.perf_counter() - start) * speed + t0
+        j = i
+        while j < len(rows) and rows[j][0] <= due: j += 1
+        if j > i: yield b''.join(line for _, line in rows[i:j]); i = j
+        if i < len(rows):
+            next_due = (rows[i][0] - t0) / speed
+            time.sleep(max(0.0, min(tick_seconds, next_due - (time.perf_counter() - start))))
+
+
+# --- 출력 대상 ---
+class _FileSink:
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+
+    def write(self, data):
+        self.file.write(data); self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class _SocketSink:
+    def __init__(self, host, port):
+        self.server = socket.create_server((host, port))
+        print(f"{host}:{port}에서 연결을 기다립니다...", file=sys.stderr)
+        self.conn, _ = self.server.accept()
+
+    def write(self, data):
+        self.conn.sendall(data)
+
+    def close(self):
+        self.conn.close(); self.server.close()
+
+
+def open_sink(spec):
+    if spec.startswith('tcp://'):
+        parts = urlsplit(spec)
+        return _SocketSink(parts.hostname or '127.0.0.1', parts.port)
+    if spec.startswith('fifo:'):
+        path = spec[len('fifo:'):]
+        if not os.path.exists(path): os.mkfifo(path)
+        print(f"{path}를 읽는 쪽이 열리기를 기다립니다...", file=sys.stderr)
+        return _FileSink(path)
+    return _FileSink(spec)
+
+
+def replay(bytes_data, sink, speed=10.0, tick_seconds=0.1, tail=None):
+    """로그를 sink로 재생합니다. tail을 주면 tick마다 poll해서 처리 지연(초) 목록을 돌려줍니다."""
+    header, rows = split_log(bytes_data)
+    sink.write(header)
+    latencies = []; rows_per_tick = []
+    for chunk in iter_ticks(rows, speed, tick_seconds):
+        sink.write(chunk)
+        if tail is not None:
+            start = time.perf_counter(); tail.poll()
+            latencies.append(time.perf_counter() - start); rows_per_tick.append(chunk.count(b'\n'))
+    return latencies, rows_per_tick
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기존 Ikawa 로그를 N배속으로 다시 흘려보냅니다.")
+    parser.add_argument('log', help="재생할 CSV 로그")
+    parser.add_argument('output', help="출력 (파일 경로, fifo:경로, tcp://호스트:포트)")
+    parser.add_argument('--speed', type=float, default=10.0, help="재생 배속")
+    parser.add_argument('--tick', type=float, default=0.1, help="최대 전송 간격 (초)")
+    parser.add_argument('--bench', action='store_true', help="같은 프로세스의 LiveTail로 tick당 처리 지연 측정 (파일 출력 전용)")
+    parser.add_argument('--ror-method', choices=ROR_METHODS, default=DEFAULT_ROR_METHOD)
+    parser.add_argument('--ror-window', type=float, default=DEFAULT_ROR_WINDOW)
+    args = parser.parse_args(argv)
+    if args.bench and (args.output.startswith('tcp://') or args.output.startswith('fifo:')):
+        parser.error("--bench는 파일 출력에서만 사용할 수 있습니다.")
+
+    with open(args.log, 'rb') as f: bytes_data = f.read()
+    sink = open_sink(args.output)
+    tail = LiveTail(open_source(args.output), args.ror_method, args.ror_window) if args.bench else None
+    start = time.perf_counter()
+    try: latencies, rows_per_tick = replay(bytes_data, sink, args.speed, args.tick, tail)
+    finally: sink.close()
+    print(f"재생 완료: {time.perf_counter() - start:.1f}초", file=sys.stderr)
+    if tail is not None and latencies:
+        ms = np.array(latencies) * 1000
+        print(f"tick {len(ms)}회 (평균 {np.mean(rows_per_tick):.1f}행), 로스팅 행 {tail.n}, 상태 {tail.phase}", file=sys.stderr)
+        print(f"처리 지연 ms: 중앙값 {np.median(ms):.3f} · p95 {np.percentile(ms, 95):.3f} · 최대 {ms.max():.3f}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
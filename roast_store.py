@@ -0,0 +1,156 @@
+import numpy as np
+
+from log_loader import (
+    TIME_COL, EXHAUST_TEMP_COL, INLET_TEMP_COL, EXHAUST_ROR_COL,
+    FAN_SPEED_COL, HUMIDITY_COL, HUMIDITY_ROC_COL,
+)
+
+# --- 그래프/분석에 사용하는 채널 (저장 순서) ---
+CHANNELS = [EXHAUST_TEMP_COL, INLET_TEMP_COL, EXHAUST_ROR_COL, FAN_SPEED_COL, HUMIDITY_COL, HUMIDITY_ROC_COL]
+
+
+class RoastLog:
+    """로그 한 개를 float32 배열로 보관합니다.
+
+    time은 모든 채널이 공유하는 시간 축이고, values는 (채널 수, 행 수) 모양의 C-contiguous 배열입니다.
+    valid[i]는 시간과 i번째 채널 값이 모두 유효한 행을 표시합니다.
+    """
+
+    __slots__ = ('time', 'values', 'valid', 'channel_index', '_valid_slices', '_sort_order', '_channel_max', 'max_time')
+
+    def __init__(self, time, values, channels=CHANNELS):
+        self.time = np.ascontiguousarray(time, dtype=np.float32)
+        self.values = np.ascontiguousarray(values, dtype=np.float32)
+        self.channel_index = {col: i for i, col in enumerate(channels)}
+        time_valid = ~np.isnan(self.time)
+        self.valid = ~np.isnan(self.values) & time_valid
+        self.max_time = float(self.time[time_valid].max()) if time_valid.any() else np.nan
+        # 유효 구간이 연속이면 복사 없이 슬라이스 뷰를 돌려줄 수 있도록 범위를 기록합니다.
+        self._valid_slices = []
+        for mask in self.valid:
+            idx = np.flatnonzero(mask)
+            contiguous = len(idx) > 0 and idx[-1] - idx[0] + 1 == len(idx)
+            self._valid_slices.append(slice(idx[0], idx[-1] + 1) if contiguous else None)
+        # 조회용 인덱스: 시간이 단조 증가가 아닐 때만 정렬 순서를 따로 저장합니다.
+        self._sort_order = None
+        if np.any(np.diff(self.time[time_valid]) < 0): self._sort_order = np.argsort(self.time, kind='stable')
+        has_valid = self.valid.any(axis=1)
+        self._channel_max = np.where(has_valid, np.where(self.valid, self.values, -np.inf).max(axis=1, initial=-np.inf), np.nan)
+
+    @classmethod
+    def from_frame(cls, df, channels=CHANNELS):
+        n = len(df)
+        time = df[TIME_COL].to_numpy(dtype=np.float32, na_value=np.nan) if TIME_COL in df.columns else np.full(n, np.nan, dtype=np.float32)
+        values = np.full((len(channels), n), np.nan, dtype=np.float32)
+        for i, col in enumerate(channels):
+            if col in df.columns: values[i] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+        return cls(time, values, channels)
+
+    def __len__(self):
+        return len(self.time)
+
+    @property
+    def channels(self):
+        return list(self.channel_index)
+
+    @property
+    def nbytes(self):
+        return self.time.nbytes + self.values.nbytes + self.valid.nbytes
+
+    def column(self, col):
+        """채널 전체 값의 뷰 (결측 포함)."""
+        return self.values[self.channel_index[col]]
+
+    def valid_series(self, col):
+        """시간과 값이 모두 유효한 (time, value) 쌍. 유효 구간이 연속이면 복사 없는 뷰입니다."""
+        i = self.channel_index.get(col)
+        if i is None: return self.time[:0], self.values[0, :0]
+        valid_slice = self._valid_slices[i]
+        if valid_slice is not None: return self.time[valid_slice], self.values[i, valid_slice]
+        mask = self.valid[i]
+        return self.time[mask], self.values[i, mask]
+
+    def lookup_series(self, col):
+        """시간 순으로 정렬된 유효 (time, value) 쌍. np.interp에 바로 넘길 수 있습니다."""
+        if self._sort_order is None: return self.valid_series(col)
+        i = self.channel_index.get(col)
+        if i is None: return self.time[:0], self.values[0, :0]
+        order = self._sort_order[self.valid[i][self._sort_order]]
+        return self.time[order], self.values[i, order]
+
+    def with_channel(self, col, values):
+        """col 채널만 values로 바꾼 새 RoastLog. 시간 축 배열은 공유합니다."""
+        matrix = self.values.copy(); matrix[self.channel_index[col]] = values
+        return RoastLog(self.time, matrix, self.channels)
+
+    def valid_count(self, col):
+        i = self.channel_index.get(col)
+        return 0 if i is None else int(np.count_nonzero(self.valid[i]))
+
+    def channel_max(self, col):
+        i = self.channel_index.get(col)
+        return np.nan if i is None else float(self._channel_max[i])
+
+
+class LookupTable:
+    """여러 로그의 모든 채널을 한 번의 searchsorted로 보간 조회합니다.
+
+    각 (로그, 채널) 구간을 서로 겹치지 않도록 오프셋을 더해 하나의 정렬된 배열로 이어 붙입니다.
+    조회 결과는 (로그 수, 채널 수, 시간 수) 모양이며, 유효 값이 2개 미만이거나 마지막 유효 시간 이후이면 NaN입니다.
+    """
+
+    def __init__(self, logs, channels=CHANNELS):
+        self.channels = list(channels)
+        n_segments = len(logs) * len(self.channels)
+        series = [log.lookup_series(col) for log in logs for col in self.channels]
+        lengths = np.array([len(t) if len(t) > 1 else 0 for t, _ in series], dtype=np.int64)
+        self.t_min = np.array([t[0] if n else np.nan for (t, _), n in zip(series, lengths)], dtype=np.float64)
+        self.t_max = np.array([t[-1] if n else np.nan for (t, _), n in zip(series, lengths)], dtype=np.float64)
+        spans = self.t_max - self.t_min
+        self.span = (np.nanmax(spans) if lengths.any() else 0.0) + 1.0
+        self.offsets = np.arange(n_segments, dtype=np.float64) * self.span
+        self.ends = np.cumsum(lengths); self.starts = self.ends - lengths
+        self.keys = np.empty(self.ends[-1] if n_segments else 0, dtype=np.float64)
+        self.values = np.empty(len(self.keys), dtype=np.float32)  # 오프셋을 더한 키만 float64 정밀도가 필요합니다.
+        for r, ((t, v), start, end) in enumerate(zip(series, self.starts, self.ends)):
+            if end > start:
+                self.keys[start:end] = t - self.t_min[r] + self.offsets[r]
+                self.values[start:end] = v
+        self.shape = (len(logs), len(self.channels))
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.keys, self.values, self.t_min, self.t_max, self.offsets, self.starts, self.ends))
+
+    def at(self, times):
+        times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+        result = np.full((len(self.offsets), len(times)), np.nan)
+        has_data = self.ends > self.starts
+        if has_data.any():
+            rows = np.flatnonzero(has_data)
+            starts = self.starts[rows, None]; ends = self.ends[rows, None]
+            # 첫 유효 시간 이전은 np.interp와 같이 첫 값으로 고정합니다.
+            q = np.maximum(times[None, :] - self.t_min[rows, None], 0.0) + self.offsets[rows, None]
+            right = np.clip(np.searchsorted(self.keys, q, side='right'), starts + 1, ends - 1)
+            left = right - 1
+            dt = self.keys[right] - self.keys[left]
+            weight = np.divide(q - self.keys[left], dt, out=np.zeros_like(q), where=dt > 0)
+            interp = self.values[left] + (self.values[right] - self.values[left]) * np.clip(weight, 0.0, 1.0)
+            interp[times[None, :] > self.t_max[rows, None]] = np.nan
+            result[rows] = interp
+        return result.reshape(self.shape + (len(times),))
+
+
+def session_memory_usage(logs, derived_logs=(), lookup_table=None, figure=None):
+    """세션에 저장된 배열 메모리 합계 (바이트).
+
+    derived_logs는 계산 ROR처럼 logs에서 만든 로그로, logs와 공유하는 배열(시간 축 등)은 한 번만 셉니다.
+    figure는 캐시된 Plotly 그림이며 트레이스의 x/y 배열만 셉니다.
+    """
+    arrays = {}
+    for log in list(logs.values()) + list(derived_logs):
+        for a in (log.time, log.values, log.valid): arrays[id(a)] = a.nbytes
+    total = sum(arrays.values()) + (lookup_table.nbytes if lookup_table is not None else 0)
+    if figure is not None:
+        total += sum(np.asarray(a).nbytes for trace in figure.data for a in (trace.x, trace.y) if a is not None)
+    return total
@@ -0,0 +1,130 @@
+import numpy as np
+
+# --- ROR 계산 엔진 (여러 로그를 2차원 배열로 한 번에 처리) ---
+ROR_METHODS = ['slope', 'savgol', 'moving', 'diff']
+DEFAULT_ROR_METHOD = 'slope'
+DEFAULT_ROR_WINDOW = 10.0  # 초
+
+
+def grid_step(time_arrays, min_step=0.1):
+    """로그들의 샘플 간격 중앙값 중 가장 작은 값을 공통 격자 간격으로 사용합니다."""
+    steps = [np.median(np.diff(t)) for t in time_arrays if len(t) > 1]
+    steps = [s for s in steps if np.isfinite(s) and s > 0]
+    return max(min(steps), min_step) if steps else 1.0
+
+
+def align(series, step=None):
+    """(time, value) 목록을 공통 시간 격자 위의 (로그 수, 격자 수) 배열로 정렬합니다.
+
+    샘플 간격이 불규칙하거나 중간에 결측이 있어도 유효 값 사이를 선형 보간하며,
+    각 로그의 첫/마지막 유효 시간 밖은 NaN입니다. (grid, matrix)를 반환합니다.
+    """
+    valid = []
+    for t, v in series:
+        t = np.asarray(t, dtype=np.float64); v = np.asarray(v, dtype=np.float64)
+        mask = np.isfinite(t) & np.isfinite(v)
+        order = np.argsort(t[mask], kind='stable')
+        valid.append((t[mask][order], v[mask][order]))
+    step = step or grid_step([t for t, _ in valid])
+    t_max = max((t[-1] for t, _ in valid if len(t)), default=0.0)
+    grid = np.arange(0.0, t_max + step / 2, step)
+    matrix = np.full((len(valid), len(grid)), np.nan)
+    for row, (t, v) in zip(matrix, valid):
+        if len(t) < 2: continue
+        inside = (grid >= t[0]) & (grid <= t[-1])
+        row[inside] = np.interp(grid[inside], t, v)
+    return grid, matrix
+
+
+def _window_sums(a, half):
+    # 누적합 차이로 각 칸 중심 (2 * half + 1)칸 창의 합을 구합니다. 메모리는 입력 크기만큼만 씁니다.
+    cumulative = np.zeros((a.shape[0], a.shape[1] + 2 * half + 1))
+    np.cumsum(np.pad(a, ((0, 0), (half, half))), axis=1, out=cumulative[:, 1:])
+    return cumulative[:, 2 * half + 1:] - cumulative[:, :-(2 * half + 1)]
+
+
+def _masked_slope(matrix, half, step):
+    # 창 안의 유효 점만으로 최소제곱 기울기를 구합니다 (결측/가장자리 자동 처리).
+    mask = np.isfinite(matrix); m = mask.astype(np.float64)
+    # 누적합 정밀도를 위해 행 평균을 빼고, 위치는 창 중심 기준으로 옮겨서 계산합니다.
+    y = np.where(mask, matrix, 0.0)
+    y -= (y.sum(axis=1) / np.maximum(m.sum(axis=1), 1.0))[:, None]; y[~mask] = 0.0
+    i = np.arange(matrix.shape[1], dtype=np.float64)
+    s = _window_sums(m, half); si = _window_sums(m * i, half); sii = _window_sums(m * (i * i), half)
+    sy = _window_sums(y, half); syi = _window_sums(y * i, half)
+    # 칸 단위 위치 합은 정수이므로 반올림해서 누적합 오차를 없앱니다 (창 1칸 이하이면 denom = 0).
+    st = np.rint(si - i * s); stt = np.rint(sii - 2 * i * si + i * i * s); s = np.rint(s)
+    sty = syi - i * sy
+    denom = s * stt - st * st
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = (s * sty - st * sy) / denom / step
+    slope[(denom <= 0) | ~mask] = np.nan
+    return slope
+
+
+def _savgol_derivative(matrix, half, step, polyorder=3):
+    k = np.arange(-half, half + 1, dtype=np.float64)
+    coeffs = np.linalg.pinv(np.vander(k, polyorder + 1, increasing=True))[1] / step
+    # 창 배열을 만들지 않고 오프셋별로 더합니다 (창에 결측이 있으면 결과도 NaN).
+    padded = np.pad(matrix, ((0, 0), (half, half)), constant_values=np.nan)
+    result = np.zeros_like(matrix)
+    for offset, coeff in enumerate(coeffs): result += coeff * padded[:, offset:offset + matrix.shape[1]]
+    # 창에 결측이 있는 가장자리는 최소제곱 기울기로 채웁니다.
+    missing = ~np.isfinite(result) & np.isfinite(matrix)
+    if missing.any(): result[missing] = _masked_slope(matrix, half, step)[missing]
+    return result
+
+
+def _moving_average(matrix, half):
+    """(평활화 값, 창이 모두 유효한지 여부). 창이 잘린 칸의 평균은 중심 쪽으로 치우칩니다."""
+    mask = np.isfinite(matrix)
+    count = _window_sums(mask.astype(np.float64), half)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        smoothed = _window_sums(np.where(mask, matrix, 0.0), half) / count
+    smoothed[~mask] = np.nan
+    return smoothed, count > 2 * half + 0.5
+
+
+def _moving_derivative(matrix, half, step):
+    smoothed, full = _moving_average(matrix, half)
+    ror = np.full_like(matrix, np.nan)
+    ror[:, 1:] = np.diff(smoothed, axis=1) / step
+    # 가장자리/결측 근처처럼 창이 잘린 칸은 평균이 치우치므로 최소제곱 기울기로 채웁니다.
+    partial = np.isfinite(matrix); partial[:, 1:] &= ~(full[:, 1:] & full[:, :-1])
+    if partial.any(): ror[partial] = _masked_slope(matrix, half, step)[partial]
+    return ror
+
+
+def compute_ror(matrix, step, method=DEFAULT_ROR_METHOD, window_seconds=DEFAULT_ROR_WINDOW):
+    """(로그 수, 격자 수) 온도 배열의 ROR(℃/sec)을 한 번에 계산합니다.
+
+    method: 'diff'(평활화 없음), 'moving'(이동 평균 후 미분), 'savgol'(Savitzky–Golay 3차 다항식 미분 필터),
+    'slope'(window_seconds 구간 최소제곱 기울기).
+    """
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float64))
+    half = max(2 if method == 'savgol' else 1, int(round(window_seconds / 2 / step)))
+    if method == 'slope': return _masked_slope(matrix, half, step)
+    if method == 'savgol': return _savgol_derivative(matrix, half, step)
+    if method == 'moving': return _moving_derivative(matrix, half, step)
+    if method != 'diff': raise ValueError(f"지원하지 않는 ROR 계산 방식입니다: {method}")
+    ror = np.full_like(matrix, np.nan)
+    ror[:, 1:] = np.diff(matrix, axis=1) / step
+    return ror
+
+
+def ror_for_series(series, method=DEFAULT_ROR_METHOD, window_seconds=DEFAULT_ROR_WINDOW, step=None):
+    """(time, temp) 목록 각각에 대해 원래 시간 축 위의 ROR 배열을 돌려줍니다."""
+    if not len(series): return []
+    grid, matrix = align(series, step)
+    step = grid[1] - grid[0] if len(grid) > 1 else 1.0
+    ror = compute_ror(matrix, step, method, window_seconds)
+    results = []
+    for (t, _), row in zip(series, ror):
+        t = np.asarray(t, dtype=np.float64)
+        finite = np.isfinite(row)
+        out = np.full(len(t), np.nan)
+        if finite.sum() > 1:
+            inside = np.isfinite(t) & (t >= grid[finite][0]) & (t <= grid[finite][-1])
+            out[inside] = np.interp(t[inside], grid[finite], row[finite])
+        results.append(out)
+    return results